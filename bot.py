@@ -1,4 +1,3 @@
-import ccxt
 import schedule
 import time
 import os
@@ -7,12 +6,11 @@ import logging
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from functools import partial
 
 from config import TRADING_CONFIG, SCHEDULE_CONFIG
-from notifications import notification_manager
+from notifications import notification_manager, startup_notification, install
 from metrics import metrics_manager
-from shared import kraken, DRY_RUN, get_event_loop  # Import from shared.py
+from shared import kraken, DRY_RUN  # Import from shared.py
 
 # Create logs directory if it doesn't exist
 Path("logs").mkdir(exist_ok=True)
@@ -31,16 +29,6 @@ logger = logging.getLogger(__name__)
 # Configuration
 STATE_FILE = 'bot_state.json'
 
-# Global event loop
-loop = None
-
-async def send_notification_async(message, level="INFO"):
-    """Async wrapper for sending notifications"""
-    try:
-        await notification_manager.send_notification(message, level)
-    except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
-
 def log_action(message, level="INFO"):
     """Helper function to log actions and send notifications"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -57,12 +45,8 @@ def log_action(message, level="INFO"):
     
     # Send notification if it's an important message
     if level in ["ERROR", "WARNING", "SUCCESS"]:
-        try:
-            logger.debug(f"Attempting to send {level} notification: {message}")
-            loop = get_event_loop()
-            loop.create_task(send_notification_async(message, level))
-        except Exception as e:
-            logger.error(f"Failed to schedule notification: {e}")
+        logger.debug("Queueing %s notification: %s", level, message)
+        notification_manager.notify(message, level)
 
 def load_state():
     """Load the bot state from file"""
@@ -78,7 +62,7 @@ def load_state():
             save_state(initial_state)
             return initial_state
     except Exception as e:
-        logger.error(f"Error loading state: {e}")
+        logger.error("Error loading state: %s", e)
         return {'monday_attempt_successful': False}
 
 def save_state(state):
@@ -87,25 +71,12 @@ def save_state(state):
         with open(STATE_FILE, 'w') as f:
             json.dump(state, f)
     except Exception as e:
-        logger.error(f"Error saving state: {e}")
+        logger.error("Error saving state: %s", e)
 
 # Load initial state
 state = load_state()
 monday_attempt_successful = state['monday_attempt_successful']
 
-# Kraken API credentials
-api_key = os.getenv('KRAKEN_API_KEY')
-api_secret = os.getenv('KRAKEN_API_SECRET')
-
-if not api_key or not api_secret:
-    raise ValueError("KRAKEN_API_KEY and KRAKEN_API_SECRET environment variables must be set")
-
-# Initialize Kraken exchange
-kraken = ccxt.kraken({
-    'apiKey': api_key,
-    'secret': api_secret,
-})
-
 async def get_available_balance(allow_usdc=True):
     """Get available balance in EUR or USDC
     
@@ -113,7 +84,7 @@ async def get_available_balance(allow_usdc=True):
         allow_usdc (bool): If True, USDC balance can be used as a fallback.
                           If False, only EUR balance will be considered.
     """
-    balance = kraken.fetch_balance()
+    balance = await kraken.fetch_balance()
     eur_balance = balance['total'].get('EUR', 0)
     usdc_balance = balance['total'].get('USDC.F', 0)  # Use USDC.F for balance check
     
@@ -133,7 +104,7 @@ async def place_limit_order_btc(amount=None, currency=None, is_percentage=False)
             start_time = time.time()
 
             # Get current balance
-            balance = kraken.fetch_balance()
+            balance = await kraken.fetch_balance()
             btc_balance = balance['total'].get('XBT.F', 0)
             
             # Get available balance in EUR or USDC
@@ -175,7 +146,7 @@ async def place_limit_order_btc(amount=None, currency=None, is_percentage=False)
             
             # Get current order book
             symbol = f"BTC/{currency}"
-            order_book = kraken.fetch_order_book(symbol, limit=3)
+            order_book = await kraken.fetch_order_book(symbol, limit=3)
             if not order_book or not order_book['bids']:
                 log_action("No bids available in order book")
                 return
@@ -214,14 +185,14 @@ async def place_limit_order_btc(amount=None, currency=None, is_percentage=False)
                     continue
             else:
                 # Place limit buy order
-                order = kraken.create_limit_buy_order(symbol, btc_amount, bid_price)
+                order = await kraken.create_limit_buy_order(symbol, btc_amount, bid_price)
                 log_action(f"Limit buy order placed: {order}")
 
                 # Wait for order timeout
                 await asyncio.sleep(TRADING_CONFIG['order_timeout_minutes'] * 60)
 
                 # Check order status
-                order_status = kraken.fetch_order(order['id'])
+                order_status = await kraken.fetch_order(order['id'])
                 if order_status['status'] == 'closed':
                     log_action(f"Order {order['id']} filled successfully.", "SUCCESS")
                     # Save the state
@@ -233,7 +204,7 @@ async def place_limit_order_btc(amount=None, currency=None, is_percentage=False)
                 else:
                     # Cancel the unfilled order
                     try:
-                        kraken.cancel_order(order['id'])
+                        await kraken.cancel_order(order['id'])
                         log_action(f"Order {order['id']} not filled in {TRADING_CONFIG['order_timeout_minutes']} minutes. Cancelled.", "WARNING")
                     except Exception as e:
                         log_action(f"Error cancelling order {order['id']}: {e}", "WARNING")
@@ -264,16 +235,23 @@ async def place_limit_order_btc(amount=None, currency=None, is_percentage=False)
 
     log_action(f"Failed to place order after {TRADING_CONFIG['max_retries']} attempts", "ERROR")
 
+# Order tasks started by scheduled jobs; kept referenced until they finish
+_order_tasks = set()
+
 def run_async(coro):
-    """Helper function to run coroutines in the event loop"""
-    loop = get_event_loop()
-    return loop.run_until_complete(coro)
+    """Start a coroutine as a task on the running event loop"""
+    task = asyncio.get_running_loop().create_task(coro)
+    _order_tasks.add(task)
+    task.add_done_callback(_order_tasks.discard)
+    return task
 
 def place_monday_order():
     """Primary order attempt on Monday"""
     global monday_attempt_successful
     monday_attempt_successful = False
-    save_state({'monday_attempt_successful': False})
+    state = load_state()
+    state['monday_attempt_successful'] = False
+    save_state(state)
     log_action("Starting Monday order attempt")
     run_async(place_limit_order_btc())
 
@@ -298,7 +276,7 @@ async def place_limit_order_sol(amount=None, currency=None, is_percentage=False)
             start_time = time.time()
             
             # Get current balance
-            balance = kraken.fetch_balance()
+            balance = await kraken.fetch_balance()
             sol_balance = balance['total'].get('SOL', 0)
             
             # Get available balance in EUR or USDC
@@ -340,7 +318,7 @@ async def place_limit_order_sol(amount=None, currency=None, is_percentage=False)
             
             # Get current order book
             symbol = f"SOL/{currency}"
-            order_book = kraken.fetch_order_book(symbol, limit=3)
+            order_book = await kraken.fetch_order_book(symbol, limit=3)
             if not order_book or not order_book['bids']:
                 log_action("No bids available in order book")
                 return
@@ -372,21 +350,21 @@ async def place_limit_order_sol(amount=None, currency=None, is_percentage=False)
                         await asyncio.sleep(TRADING_CONFIG['retry_delay_seconds'])
                     continue
             else:
-                order = kraken.create_limit_buy_order(symbol, sol_amount, bid_price)
+                order = await kraken.create_limit_buy_order(symbol, sol_amount, bid_price)
                 log_action(f"Limit buy order placed: {order}")
 
                 # Wait for order timeout
                 await asyncio.sleep(TRADING_CONFIG['order_timeout_minutes'] * 60)
 
                 # Check order status
-                order_status = kraken.fetch_order(order['id'])
+                order_status = await kraken.fetch_order(order['id'])
                 if order_status['status'] == 'closed':
                     log_action(f"Order {order['id']} filled successfully.", "SUCCESS")
                     metrics_manager.record_order_success(sol_amount, bid_price, time.time() - start_time)
                     return
                 else:
                     try:
-                        kraken.cancel_order(order['id'])
+                        await kraken.cancel_order(order['id'])
                         log_action(f"Order {order['id']} not filled in {TRADING_CONFIG['order_timeout_minutes']} minutes. Cancelled.", "WARNING")
                     except Exception as e:
                         log_action(f"Error cancelling order {order['id']}: {e}", "WARNING")
@@ -422,7 +400,7 @@ async def place_limit_order_eth(amount=None, currency=None, is_percentage=False)
             start_time = time.time()
             
             # Get current balance
-            balance = kraken.fetch_balance()
+            balance = await kraken.fetch_balance()
             eth_balance = balance['total'].get('ETH', 0)
             
             # Get available balance in EUR or USDC
@@ -464,7 +442,7 @@ async def place_limit_order_eth(amount=None, currency=None, is_percentage=False)
             
             # Get current order book
             symbol = f"ETH/{currency}"
-            order_book = kraken.fetch_order_book(symbol, limit=3)
+            order_book = await kraken.fetch_order_book(symbol, limit=3)
             if not order_book or not order_book['bids']:
                 log_action("No bids available in order book")
                 return
@@ -496,21 +474,21 @@ async def place_limit_order_eth(amount=None, currency=None, is_percentage=False)
                         await asyncio.sleep(TRADING_CONFIG['retry_delay_seconds'])
                     continue
             else:
-                order = kraken.create_limit_buy_order(symbol, eth_amount, bid_price)
+                order = await kraken.create_limit_buy_order(symbol, eth_amount, bid_price)
                 log_action(f"Limit buy order placed: {order}")
 
                 # Wait for order timeout
                 await asyncio.sleep(TRADING_CONFIG['order_timeout_minutes'] * 60)
 
                 # Check order status
-                order_status = kraken.fetch_order(order['id'])
+                order_status = await kraken.fetch_order(order['id'])
                 if order_status['status'] == 'closed':
                     log_action(f"Order {order['id']} filled successfully.", "SUCCESS")
                     metrics_manager.record_order_success(eth_amount, bid_price, time.time() - start_time)
                     return
                 else:
                     try:
-                        kraken.cancel_order(order['id'])
+                        await kraken.cancel_order(order['id'])
                         log_action(f"Order {order['id']} not filled in {TRADING_CONFIG['order_timeout_minutes']} minutes. Cancelled.", "WARNING")
                     except Exception as e:
                         log_action(f"Error cancelling order {order['id']}: {e}", "WARNING")
@@ -546,7 +524,7 @@ async def place_limit_order_usdc(amount=None, currency=None, is_percentage=False
             start_time = time.time()
             
             # Get current balance
-            balance = kraken.fetch_balance()
+            balance = await kraken.fetch_balance()
             usdc_balance = balance['total'].get('USDC.F', 0)  # Use USDC.F for balance check
             
             # Get available balance in EUR
@@ -583,7 +561,7 @@ async def place_limit_order_usdc(amount=None, currency=None, is_percentage=False
             
             # Get current order book
             symbol = 'USDC/EUR'  # USDC can only be bought with EUR
-            order_book = kraken.fetch_order_book(symbol, limit=3)
+            order_book = await kraken.fetch_order_book(symbol, limit=3)
             if not order_book or not order_book['bids']:
                 log_action("No bids available in order book")
                 return
@@ -615,21 +593,21 @@ async def place_limit_order_usdc(amount=None, currency=None, is_percentage=False
                         await asyncio.sleep(TRADING_CONFIG['retry_delay_seconds'])
                     continue
             else:
-                order = kraken.create_limit_buy_order(symbol, usdc_amount, bid_price)
+                order = await kraken.create_limit_buy_order(symbol, usdc_amount, bid_price)
                 log_action(f"Limit buy order placed: {order}")
 
                 # Wait for order timeout
                 await asyncio.sleep(TRADING_CONFIG['order_timeout_minutes'] * 60)
 
                 # Check order status
-                order_status = kraken.fetch_order(order['id'])
+                order_status = await kraken.fetch_order(order['id'])
                 if order_status['status'] == 'closed':
                     log_action(f"Order {order['id']} filled successfully.", "SUCCESS")
                     metrics_manager.record_order_success(usdc_amount, bid_price, time.time() - start_time)
                     return
                 else:
                     try:
-                        kraken.cancel_order(order['id'])
+                        await kraken.cancel_order(order['id'])
                         log_action(f"Order {order['id']} not filled in {TRADING_CONFIG['order_timeout_minutes']} minutes. Cancelled.", "WARNING")
                     except Exception as e:
                         log_action(f"Error cancelling order {order['id']}: {e}", "WARNING")
@@ -658,14 +636,18 @@ async def place_limit_order_usdc(amount=None, currency=None, is_percentage=False
 def initialize_bot():
     """Initialize the bot and set up callbacks"""
     # Set up the buy callbacks in the notification manager
-    notification_manager.set_buy_callback(place_limit_order_btc)
-    notification_manager.set_buy_sol_callback(place_limit_order_sol)
-    notification_manager.set_buy_eth_callback(place_limit_order_eth)
-    notification_manager.set_buy_usdc_callback(place_limit_order_usdc)
+    notification_manager.register('buy', place_limit_order_btc)
+    notification_manager.register('buysol', place_limit_order_sol)
+    notification_manager.register('buyeth', place_limit_order_eth)
+    notification_manager.register('buyusdc', place_limit_order_usdc)
     
     # Set up scheduling state callback
     def handle_scheduling_state(enabled):
         """Handle scheduling state changes"""
+        # Persist the choice so a restart doesn't silently re-enable scheduling
+        state = load_state()
+        state['scheduling_enabled'] = enabled
+        save_state(state)
         if enabled:
             # Re-enable all scheduled tasks
             schedule.every().monday.at(SCHEDULE_CONFIG['monday_time']).do(place_monday_order)
@@ -676,7 +658,7 @@ def initialize_bot():
             schedule.clear()
             log_action("Bot scheduling has been disabled", "WARNING")
     
-    notification_manager.set_scheduling_state_callback(handle_scheduling_state)
+    notification_manager.register('scheduling_state', handle_scheduling_state)
     
     # Start the metrics server if enabled
     if metrics_manager.enabled:
@@ -684,7 +666,12 @@ def initialize_bot():
     
     # Load initial state
     state = load_state()
-    logger.info(f"Bot initialized with state: {state}")
+    logger.info("Bot initialized with state: %s", state)
+
+    # Restore a /disable from before the last restart
+    if not state.get('scheduling_enabled', True):
+        schedule.clear()
+        notification_manager.set_scheduling_enabled(False)
 
 # Handle different modes
 if DRY_RUN:
@@ -713,18 +700,33 @@ else:
     log_action(f"Scheduled to run on Monday {SCHEDULE_CONFIG['monday_time']} {SCHEDULE_CONFIG['timezone']} with fallback to Sunday {SCHEDULE_CONFIG['sunday_time']} {SCHEDULE_CONFIG['timezone']}")
     log_action(f"Current state: Monday attempt {'successful' if monday_attempt_successful else 'not successful'}")
 
-if __name__ == "__main__":
+async def main():
+    """Run the order scheduler on the same event loop as the Telegram bot"""
+    # On Python 3.12+, tasks that finish without suspending (e.g. a notification
+    # with Telegram disabled) complete inside create_task instead of taking a loop turn
+    if hasattr(asyncio, 'eager_task_factory'):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    install()
+    initialize_bot()
     try:
-        initialize_bot()
-        # Main loop
+        notification_manager.start_price_feed()
+        await startup_notification()
         while True:
-            # Only run scheduled tasks if scheduling is enabled
-            if notification_manager.is_scheduling_enabled():
-                schedule.run_pending()
-            loop = get_event_loop()
-            loop.run_until_complete(asyncio.sleep(1))
-    except KeyboardInterrupt:
+            # Only run scheduled tasks if scheduling is enabled; /disable parks the loop here
+            await notification_manager.wait_scheduling_enabled()
+            schedule.run_pending()
+            # Sleep until the next job is due instead of waking every second
+            idle = schedule.idle_seconds()
+            await asyncio.sleep(60 if idle is None else min(max(idle, 0), 60))
+    except asyncio.CancelledError:
         log_action("Bot stopped by user", "WARNING")
     finally:
-        if loop:
-            loop.close()
+        await notification_manager.stop()
+        await kraken.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # Interrupted before the signal handlers were installed; main() already cleaned up
+        pass
@@ -12,6 +12,7 @@ TRADING_CONFIG = {
     'order_timeout_minutes': int(os.getenv('ORDER_TIMEOUT_MINUTES', '5')),
     'max_retries': int(os.getenv('MAX_RETRIES', '10')),
     'retry_delay_seconds': int(os.getenv('RETRY_DELAY_SECONDS', '5')),
+    'price_feed_enabled': os.getenv('PRICE_FEED_ENABLED', 'False').lower() == 'true',  # Stream prices over WebSocket
 }
 
 # Schedule Configuration
@@ -26,6 +27,10 @@ NOTIFICATION_CONFIG = {
     'telegram_enabled': os.getenv('TELEGRAM_ENABLED', 'False').lower() == 'true',
     'telegram_token': os.getenv('TELEGRAM_BOT_TOKEN', ''),
     'telegram_chat_id': os.getenv('TELEGRAM_CHAT_ID', ''),
+    'telegram_webhook_url': os.getenv('TELEGRAM_WEBHOOK_URL', ''),  # Empty = use long polling
+    'telegram_webhook_listen': os.getenv('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0'),
+    'telegram_webhook_port': int(os.getenv('TELEGRAM_WEBHOOK_PORT', '8443')),
+    'telegram_webhook_secret': os.getenv('TELEGRAM_WEBHOOK_SECRET', ''),
     'email_enabled': os.getenv('EMAIL_ENABLED', 'False').lower() == 'true',
     'email_smtp_server': os.getenv('EMAIL_SMTP_SERVER', ''),
     'email_smtp_port': int(os.getenv('EMAIL_SMTP_PORT', '587')),
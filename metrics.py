@@ -1,7 +1,6 @@
 import logging
 from prometheus_client import start_http_server, Counter, Gauge, Histogram
 from config import METRICS_CONFIG
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +20,9 @@ class MetricsManager:
         if self.enabled:
             try:
                 start_http_server(METRICS_CONFIG['port'])
-                logger.info(f"Metrics server started on port {METRICS_CONFIG['port']}")
+                logger.info("Metrics server started on port %s", METRICS_CONFIG['port'])
             except Exception as e:
-                logger.error(f"Failed to start metrics server: {e}")
+                logger.error("Failed to start metrics server: %s", e)
                 self.enabled = False
         self._last_order_time = None
 
@@ -1,95 +1,459 @@
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from telegram import Bot, Update
-from telegram.ext import Updater, CommandHandler, CallbackContext
+import aiosmtplib
+from email.message import EmailMessage
+from telegram import Update
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackContext, filters
 from telegram.error import TelegramError, BadRequest, NetworkError
-from config import NOTIFICATION_CONFIG
+from cachetools import TTLCache
+from config import NOTIFICATION_CONFIG, TRADING_CONFIG
+from shared import kraken, DRY_RUN, DRY_RUN_OFFLINE
 import asyncio
-import threading
-from datetime import datetime
+import ccxt
+import ccxt.pro
+import collections
+import contextlib
+import functools
 import time
+import re
 import signal
 
 logger = logging.getLogger(__name__)
 
+# Buy amount: a plain decimal, optionally followed by % for a share of the balance
+_AMOUNT_RE = re.compile(r'^(\d+(?:\.\d+)?)(%)?$')
+
+PortfolioAsset = collections.namedtuple('PortfolioAsset', 'key balance_key symbol decimals')
+
+# Every non-EUR asset /status and /balance value in EUR; adding an asset is one
+# entry here, and its balance line in both replies is generated from it
+PORTFOLIO_ASSETS = (
+    PortfolioAsset('usdc', 'USDC.F', 'USDC/EUR', 2),
+    PortfolioAsset('btc', 'XBT.F', 'BTC/EUR', 8),
+    PortfolioAsset('eth', 'ETH.F', 'ETH/EUR', 8),
+    PortfolioAsset('sol', 'SOL', 'SOL/EUR', 8),
+)
+PORTFOLIO_SYMBOLS = tuple(asset.symbol for asset in PORTFOLIO_ASSETS)
+
+# One line per balance, shared by STATUS_TEMPLATE and BALANCE_TEMPLATE
+_BALANCE_LINES = "EUR: {eur:.2f} EUR\n" + "".join(
+    f"{asset.key.upper()}: {{{asset.key}:.{asset.decimals}f}} {asset.key.upper()} (≈ {{{asset.key}_eur:.2f}} EUR)\n"
+    for asset in PORTFOLIO_ASSETS
+)
+
+# Message templates are parsed once at import; handlers only fill them in
+STATUS_TEMPLATE = (
+    "🤖 Detailed Bot Status\n\n"
+    "🔹 System Status:\n"
+    "• Mode: {mode}\n"
+    "• Bot State: {running}\n"
+    "• Scheduling: {scheduling}\n"
+    "• Last Update: {ts}\n\n"
+    "🔹 Portfolio Balances:\n"
+    + _BALANCE_LINES
+    + "\n"
+    "🔹 Total Portfolio Value:\n"
+    "• {total:.2f} EUR\n\n"
+    "{trades}"
+    "🔹 System Information:\n"
+    "• Command Rate Limit: {burst} commands per chat, refilling every {refill:.0f} seconds\n"
+    "• Price Check Cooldown: {price_cooldown} seconds\n"
+    "• Bot Uptime: {uptime}\n"
+    "• Last Command: {last_command}\n"
+)
+
+# Every pair /price shows; also what the WebSocket price feed subscribes to
+PRICE_SYMBOLS = ('BTC/EUR', 'BTC/USDC', 'ETH/EUR', 'ETH/USDC', 'SOL/EUR', 'SOL/USDC', 'USDC/EUR')
+
+# Canned Kraken responses served instead of API calls when DRY_RUN_OFFLINE is set
+DRY_RUN_FIXTURES = {
+    'balance': {'total': {'EUR': 1000.0, 'USDC.F': 500.0, 'XBT.F': 0.01, 'ETH.F': 0.5, 'SOL': 10.0}},
+    'tickers': {
+        symbol: {'symbol': symbol, 'last': last} for symbol, last in (
+            ('BTC/EUR', 60000.0), ('BTC/USDC', 65000.0),
+            ('ETH/EUR', 3000.0), ('ETH/USDC', 3250.0),
+            ('SOL/EUR', 150.0), ('SOL/USDC', 162.5),
+            ('USDC/EUR', 0.92),
+        )
+    },
+    'closed_orders': [
+        {'symbol': 'BTC/EUR', 'side': 'buy', 'amount': 0.001, 'price': 58000.0, 'status': 'closed', 'timestamp': 1704067200000},
+    ],
+}
+
+TRADE_TEMPLATE = (
+    "• {side} {symbol}\n"
+    "  Amount: {amount:.8f}\n"
+    "  Price: {price:.2f}\n"
+    "  Total: {cost:.2f}\n"
+    "  Status: {status}\n"
+    "  Time: {ts}\n\n"
+)
+
+BALANCE_TEMPLATE = (
+    "💰 Your Balances:\n\n"
+    + _BALANCE_LINES
+    + "\n"
+    "Total Value: {total:.2f} EUR\n\n"
+    "Last Update: {ts}"
+)
+
+HISTORY_ENTRY_TEMPLATE = (
+    "🔹 {side} {symbol}\n"
+    "• Amount: {amount:.8f}\n"
+    "• Price: {price:.2f}\n"
+    "• Total: {cost:.2f}\n"
+    "• Status: {status}\n"
+    "• Time: {ts}\n\n"
+)
+
+_TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Filled in PRICE_SYMBOLS order; "Last Update" is appended per reply
+PRICE_TEMPLATE = (
+    "💰 Current Prices:\n\n"
+    "Bitcoin (BTC):\n"
+    "• {0:.2f} EUR\n"
+    "• {1:.2f} USDC\n\n"
+    "Ethereum (ETH):\n"
+    "• {2:.2f} EUR\n"
+    "• {3:.2f} USDC\n\n"
+    "Solana (SOL):\n"
+    "• {4:.2f} EUR\n"
+    "• {5:.2f} USDC\n\n"
+    "USDC:\n"
+    "• {6:.4f} EUR\n\n"
+)
+
+STATUS_ERROR_TEMPLATE = (
+    "❌ Error fetching status information:\n"
+    "Error: {error}\n\n"
+    "Bot is still running in {mode} mode.\n"
+    "Please try again in a few moments."
+)
+
+# Commands listed in the message sent while the bot connects to Telegram
+_COMMANDS = (
+    ("start", "Start the bot and get welcome message"),
+    ("help", "Show detailed help for all commands"),
+    ("buy", "Buy BTC with available EUR/USDC"),
+    ("buysol", "Buy SOL with available EUR/USDC"),
+    ("buyeth", "Buy ETH with available EUR/USDC"),
+    ("buyusdc", "Buy USDC with EUR"),
+    ("price", "Check current prices"),
+    ("balance", "Check your balances"),
+    ("status", "Check bot status and all balances"),
+    ("history", "View recent trading history"),
+    ("enable", "Enable bot scheduling"),
+    ("disable", "Disable bot scheduling"),
+)
+
+_STARTING_UP_MESSAGE = (
+    "🔔 Bot is starting up and testing notifications...\n\n"
+    "Available commands:\n"
+    + "\n".join(f"/{command} - {description}" for command, description in _COMMANDS)
+)
+
+# Reply to /start
+_WELCOME_MESSAGE = (
+    "👋 Welcome to the Kraken Trading Bot!\n\n"
+    "This bot helps you manage your cryptocurrency trades on Kraken.\n\n"
+    "🔹 Main Features:\n"
+    "• Buy BTC, ETH, SOL, and USDC\n"
+    "• Check prices and balances\n"
+    "• View trading history\n"
+    "• Automated scheduled trading\n\n"
+    "📝 Quick Start:\n"
+    "1. Use /help to see all available commands\n"
+    "2. Use /price to check current prices\n"
+    "3. Use /balance to check your balances\n"
+    "4. Use /buy, /buysol, /buyeth, or /buyusdc to make trades\n\n"
+    "⚠️ Important:\n"
+    "• All trades require confirmation\n"
+    "• Minimum trade amount is 10 EUR/USDC\n"
+    "• Bot scheduling can be enabled/disabled\n\n"
+    "Need help? Use /help for detailed command information."
+)
+
+# Reply to /help
+_HELP_MESSAGE = (
+    "📚 Command Help\n\n"
+    "🔹 Trading Commands:\n"
+    "/buy - Buy BTC\n"
+    "• Uses available EUR or USDC balance\n"
+    "• Requires confirmation\n"
+    "• Minimum 10 EUR/USDC required\n\n"
+    "/buysol - Buy SOL\n"
+    "• Uses available EUR or USDC balance\n"
+    "• Requires confirmation\n"
+    "• Minimum 10 EUR/USDC required\n\n"
+    "/buyeth - Buy ETH\n"
+    "• Uses available EUR or USDC balance\n"
+    "• Requires confirmation\n"
+    "• Minimum 10 EUR/USDC required\n\n"
+    "/buyusdc - Buy USDC\n"
+    "• Uses EUR balance only\n"
+    "• Requires confirmation\n"
+    "• Minimum 10 EUR required\n\n"
+    "🔹 Information Commands:\n"
+    "/price - Check current prices\n"
+    "• Shows BTC, ETH, SOL prices in EUR and USDC\n"
+    "• 10-second cooldown between checks\n\n"
+    "/balance - Check your balances\n"
+    "• Shows available EUR, USDC, BTC, ETH, SOL balances\n"
+    "• Includes approximate values in EUR\n\n"
+    "/status - Full status check\n"
+    "• Shows all balances and current prices\n"
+    "• Includes bot status and scheduling state\n\n"
+    "/history - View trading history\n"
+    "• Shows recent trades and their status\n"
+    "• Includes order details and timestamps\n\n"
+    "🔹 Control Commands:\n"
+    "/enable - Enable bot scheduling\n"
+    "• Enables automatic Monday/Sunday trading\n"
+    "• Requires confirmation\n\n"
+    "/disable - Disable bot scheduling\n"
+    "• Disables automatic trading\n"
+    "• Requires confirmation\n\n"
+    "⚠️ Important Notes:\n"
+    "• All trades require /confirm within 30 seconds\n"
+    "• Minimum trade amount is 10 EUR/USDC\n"
+    "• Price checks have a 10-second cooldown\n"
+    "• Bot scheduling can be enabled/disabled\n"
+    "• All commands are logged for security"
+)
+
+# Emoji prefix for each notification level
+_LEVEL_PREFIX = {
+    "INFO": "ℹ️ ",
+    "WARNING": "⚠️ ",
+    "ERROR": "❌ ",
+    "SUCCESS": "✅ ",
+}
+_DEFAULT_LEVEL_PREFIX = _LEVEL_PREFIX["INFO"]
+
+BuySpec = collections.namedtuple('BuySpec', 'command asset order log_name currencies')
+
+# One entry per /buy* command; the handler and /confirm are driven by this table,
+# and the order callback is registered under the command name
+BUY_SPECS = {
+    spec.command: spec for spec in (
+        BuySpec('buy', 'BTC', 'a buy order', 'Buy', ('EUR', 'USDC')),
+        BuySpec('buysol', 'SOL', 'a SOL buy order', 'Buy SOL', ('EUR', 'USDC')),
+        BuySpec('buyeth', 'ETH', 'an ETH buy order', 'Buy ETH', ('EUR', 'USDC')),
+        BuySpec('buyusdc', 'USDC', 'a USDC buy order', 'Buy USDC', ('EUR',)),
+    )
+}
+
+@functools.lru_cache(maxsize=256)
+def _parse_buy_command(args):
+    """Parse buy command arguments, given as a tuple so results can be cached
+    Returns: (amount, currency, is_percentage) or (None, None, None) if invalid
+    """
+    if not args:
+        return None, None, None
+
+    # Validate the amount up front instead of relying on float() raising
+    match = _AMOUNT_RE.match(args[0].strip())
+    if not match:
+        return None, None, None
+
+    amount = float(match.group(1))
+    is_percentage = bool(match.group(2))
+    if amount <= 0:
+        return None, None, None
+
+    # Parse currency if provided
+    currency = None
+    if len(args) > 1:
+        currency = args[1].strip().upper()
+        if currency not in ['EUR', 'USDC']:
+            return None, None, None
+
+    return amount, currency, is_percentage
+
+@functools.lru_cache(maxsize=32)
+def _format_prices(prices):
+    """Format the /price body for a tuple of last prices in PRICE_SYMBOLS order"""
+    return PRICE_TEMPLATE.format(*prices)
+
+def _portfolio(balance, tickers):
+    """Return the balances, their EUR values and the total, keyed the way the templates expect
+
+    tickers are in PORTFOLIO_SYMBOLS order.
+    """
+    totals = balance.get('total', {})
+    portfolio = {'eur': totals.get('EUR', 0)}
+    total = portfolio['eur']
+    for asset, ticker in zip(PORTFOLIO_ASSETS, tickers):
+        amount = portfolio[asset.key] = totals.get(asset.balance_key, 0)
+        value = portfolio[asset.key + '_eur'] = amount * ticker['last']
+        total += value
+    portfolio['total'] = total
+    return portfolio
+
+def _now_ts():
+    """Format the current local time for messages"""
+    return time.strftime(_TS_FORMAT)
+
+def _order_ts(timestamp_ms):
+    """Format a Kraken millisecond timestamp as local time for messages"""
+    return time.strftime(_TS_FORMAT, time.localtime(timestamp_ms / 1000))
+
+class TokenBucket:
+    """Token bucket rate limiter allowing short bursts up to a fixed rate"""
+
+    __slots__ = ('rate', 'burst', '_ns_per_token', '_capacity_ns', '_credit_ns', '_last_refill_ns')
+
+    def __init__(self, rate, burst):
+        self.rate = rate  # tokens added per second
+        self.burst = burst  # maximum number of stored tokens
+        # The bucket holds integer nanoseconds of refill time, one token per _ns_per_token
+        self._ns_per_token = round(1_000_000_000 / rate)
+        self._capacity_ns = burst * self._ns_per_token
+        self._credit_ns = self._capacity_ns
+        self._last_refill_ns = time.monotonic_ns()  # immune to wall-clock adjustments
+
+    def consume(self, tokens=1):
+        """Take tokens from the bucket, returning False if not enough are available"""
+        now_ns = time.monotonic_ns()
+        self._credit_ns = min(self._capacity_ns, self._credit_ns + now_ns - self._last_refill_ns)
+        self._last_refill_ns = now_ns
+        cost_ns = tokens * self._ns_per_token
+        if self._credit_ns < cost_ns:
+            return False
+        self._credit_ns -= cost_ns
+        return True
+
+    async def acquire(self, tokens=1):
+        """Wait until enough tokens are available, then take them"""
+        while not self.consume(tokens):
+            await asyncio.sleep((tokens * self._ns_per_token - self._credit_ns) / 1_000_000_000)
+
+def command_handler(error_message, require_cooldown=True):
+    """Wrap a command handler with the rate limit and initialization checks
+
+    Authorization is done by the chat filter every handler is registered with.
+    Any exception raised by the handler is logged and reported back to the
+    chat as "<error_message>: <exception>".
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, update, context, **kwargs):
+            chat_id = update.effective_chat.id
+            try:
+                if require_cooldown and not self._check_command_cooldown(chat_id):
+                    return
+
+                if not self._ready:
+                    logger.warning("%s called but bot not properly initialized", func.__name__)
+                    await update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
+                    return
+
+                await func(self, update, context, **kwargs)
+            except Exception as e:
+                error_msg = f"{error_message}: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                await self._reply_safe(update, error_msg)
+        return wrapper
+    return decorator
+
 class NotificationManager:
     def __init__(self):
         self.telegram_bot = None
+        self._send = None
         self.initialized = False
-        self.updater = None
-        self._polling_thread = None
-        self._last_command_time = 0
-        self._command_cooldown = 2  # seconds between commands
-        self._stop_event = threading.Event()
-        self._reconnect_delay = 5  # seconds to wait before reconnecting
+        self._ready = False  # True once initialize() has the updater receiving commands, until stop
+        self.application = None
+        self._telegram_enabled = NOTIFICATION_CONFIG['telegram_enabled']
+        self._authorized_chat_id = self._parse_chat_id(NOTIFICATION_CONFIG['telegram_chat_id'])
+        self._webhook_url = NOTIFICATION_CONFIG['telegram_webhook_url']
+        self._webhook_listen = NOTIFICATION_CONFIG['telegram_webhook_listen']
+        self._webhook_port = NOTIFICATION_CONFIG['telegram_webhook_port']
+        self._webhook_secret = NOTIFICATION_CONFIG['telegram_webhook_secret']
+        self._email_enabled = NOTIFICATION_CONFIG['email_enabled']
+        self._email_server = NOTIFICATION_CONFIG['email_smtp_server']
+        self._email_port = NOTIFICATION_CONFIG['email_smtp_port']
+        self._email_username = NOTIFICATION_CONFIG['email_username']
+        self._email_password = NOTIFICATION_CONFIG['email_password']
+        self._email_from = NOTIFICATION_CONFIG['email_username']
+        self._email_to = NOTIFICATION_CONFIG['email_recipient']
+        self._start_monotonic = time.monotonic()  # for the uptime shown in /status
+        self._last_command_time = None  # time.monotonic() of the last accepted command
+        self._command_rate = 0.5  # commands per second per chat, i.e. one every 2 seconds
+        self._command_burst = 3  # commands a chat may send back to back
+        self._command_buckets = {}  # chat_id: TokenBucket
+        self._kraken_bucket = TokenBucket(rate=0.5, burst=15)  # REST calls made by commands, within Kraken's API counter
         self._startup_notification_sent = False  # Track if startup notification was sent
-        self._loop = None  # Will be set when needed
-        self._pending_buy_confirmation = {}  # chat_id: (timestamp, command_type, amount, currency, is_percentage)
-        self._buy_callback = None  # Callback for buy orders
-        self._scheduling_enabled = True  # Track if bot scheduling is enabled
-        self._scheduling_state_callback = None  # Callback to control bot scheduling
-        self._buy_sol_callback = None  # Callback for SOL buy orders
-        self._buy_eth_callback = None  # Callback for ETH buy orders
-        self._buy_usdc_callback = None  # Callback for USDC buy orders
+        # chat_id: (command_type, amount, currency, is_percentage), expired after the 30 second confirmation window
+        self._pending_buy_confirmation = TTLCache(maxsize=256, ttl=30)
+        self._callbacks = {}  # name: callable, see register()
+        self._scheduling_event = asyncio.Event()  # Set while bot scheduling is enabled
+        self._scheduling_event.set()
         self._last_price_check = {}  # Store last price check time per chat
+        self._background_tasks = set()
+        self._notif_queue = asyncio.Queue(maxsize=256)  # (message, level) pairs for the sender task
+        self._notif_task = None
+        self._kraken_cache = {}  # key: (monotonic timestamp, value)
+        self._kraken_cache_locks = {}  # key: asyncio.Lock, so concurrent misses share one fetch
+        self._kraken_cache_ttl = 3.0  # seconds to reuse Kraken responses across commands
+        self._batch_tickers = True  # Cleared if the exchange doesn't support fetch_tickers
+        self._prices = {}  # symbol: (monotonic timestamp, latest ticker pushed by the WebSocket price feed)
+        self._price_max_age = 3 * self._kraken_cache_ttl  # seconds before a streamed ticker is ignored
+        self._price_feed_tasks = []
+        self._ws_exchange = None
+        self._smtp = None  # Persistent SMTP connection, opened on the first email
+        self._smtp_lock = asyncio.Lock()  # Serializes use of the shared SMTP connection
+        self._init_lock = asyncio.Lock()  # Prevents duplicate initialize() calls from notifications
         self._price_check_cooldown = 10  # seconds between price checks
 
-    def _start_polling(self):
-        """Start polling in a separate thread"""
-        while not self._stop_event.is_set():
-            try:
-                if not self.initialized or self.updater is None:
-                    logger.warning("Polling thread detected bot not initialized, attempting to initialize...")
-                    asyncio.run(self.initialize())
-                    if not self.initialized:
-                        logger.error("Failed to initialize bot in polling thread")
-                        time.sleep(self._reconnect_delay)
-                        continue
-
-                logger.info("Starting Telegram bot polling...")
-                self.updater.start_polling(drop_pending_updates=True, poll_interval=0.5)
-                logger.info("Telegram bot polling started successfully")
-                
-                # Keep the thread alive and monitor the polling
-                while not self._stop_event.is_set():
-                    if not self.updater.running:
-                        logger.warning("Polling stopped, attempting to restart...")
-                        break
-                    time.sleep(1)
-                
-                if not self._stop_event.is_set():
-                    logger.warning("Polling stopped, attempting to reinitialize...")
-                    self.initialized = False
-                    time.sleep(self._reconnect_delay)
-                    
-            except Exception as e:
-                logger.error(f"Error in polling thread: {e}")
-                if not self._stop_event.is_set():
-                    time.sleep(self._reconnect_delay)
-                    self.initialized = False
+    @staticmethod
+    def _parse_chat_id(chat_id):
+        """Convert the configured chat ID to the integer form used by Telegram updates"""
+        try:
+            return int(chat_id)
+        except (TypeError, ValueError):
+            return None
+
+    async def _stop_application(self):
+        """Stop polling and shut down the current Telegram application"""
+        self._ready = False
+        application = self.application
+        if application is None:
+            return
+        try:
+            if application.updater and application.updater.running:
+                await application.updater.stop()
+            if application.running:
+                await application.stop()
+            await application.shutdown()
+        except Exception as e:
+            logger.error("Error stopping Telegram application: %s", e)
 
-    def stop(self):
+    async def stop(self):
         """Stop the notification manager"""
         logger.info("Stopping notification manager...")
-        self._stop_event.set()
-        if self.updater:
+        if self._notif_task is not None:
+            # Let queued notifications (e.g. the shutdown message) go out first
             try:
-                self.updater.stop()
-            except Exception as e:
-                logger.error(f"Error stopping updater: {e}")
-        if self._polling_thread and self._polling_thread.is_alive():
-            self._polling_thread.join(timeout=5)
+                await asyncio.wait_for(self._notif_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("Dropping %s queued notifications on shutdown", self._notif_queue.qsize())
+            self._notif_task.cancel()
+            self._notif_task = None
+        await self._stop_price_feed()
+        await self._stop_application()
+        async with self._smtp_lock:
+            await self._close_smtp_connection()
+        self.initialized = False
         logger.info("Notification manager stopped")
 
     async def initialize(self):
         """Initialize the Telegram bot asynchronously"""
-        if self.initialized and self.updater and self.updater.running:
+        if self._ready:
             logger.info("Telegram bot already initialized and running")
             return
 
-        if not NOTIFICATION_CONFIG['telegram_enabled']:
+        if not self._telegram_enabled:
             logger.info("Telegram notifications are disabled")
             return
 
@@ -97,67 +461,60 @@ class NotificationManager:
             logger.error("Telegram bot token is not set")
             return
 
-        if not NOTIFICATION_CONFIG['telegram_chat_id']:
-            logger.error("Telegram chat ID is not set")
+        if self._authorized_chat_id is None:
+            logger.error("Telegram chat ID is not set or is not a valid integer")
             return
 
         try:
             logger.info("Initializing Telegram bot...")
-            # Initialize the bot and updater
-            if self.updater:
-                try:
-                    self.updater.stop()
-                except Exception as e:
-                    logger.error(f"Error stopping existing updater: {e}")
+            # Initialize the bot and application
+            await self._stop_application()
             
-            self.updater = Updater(token=NOTIFICATION_CONFIG['telegram_token'], use_context=True)
-            self.telegram_bot = self.updater.bot
+            # Bot API calls share a small pool of persistent HTTP/2 connections, and
+            # updates are handled concurrently so a slow /status doesn't hold up /price
+            self.application = (
+                Application.builder()
+                .token(NOTIFICATION_CONFIG['telegram_token'])
+                .http_version('2')
+                .connection_pool_size(8)
+                .concurrent_updates(True)
+                .build()
+            )
+            self.telegram_bot = self.application.bot
+            # Every notification goes to the same chat, so bind it once
+            self._send = functools.partial(self.telegram_bot.send_message, chat_id=self._authorized_chat_id)
             
             # Add command handlers
-            dispatcher = self.updater.dispatcher
-            dispatcher.add_handler(CommandHandler("start", self.handle_start_command))
-            dispatcher.add_handler(CommandHandler("help", self.handle_help_command))
-            dispatcher.add_handler(CommandHandler("buy", self.handle_buy_command))
-            dispatcher.add_handler(CommandHandler("buysol", self.handle_buy_sol_command))
-            dispatcher.add_handler(CommandHandler("buyeth", self.handle_buy_eth_command))
-            dispatcher.add_handler(CommandHandler("buyusdc", self.handle_buy_usdc_command))
-            dispatcher.add_handler(CommandHandler("status", self.handle_status_command))
-            dispatcher.add_handler(CommandHandler("confirm", self.handle_confirm_command))
-            dispatcher.add_handler(CommandHandler("enable", self.handle_enable_command))
-            dispatcher.add_handler(CommandHandler("disable", self.handle_disable_command))
-            dispatcher.add_handler(CommandHandler("price", self.handle_price_command))
-            dispatcher.add_handler(CommandHandler("balance", self.handle_balance_command))
-            dispatcher.add_handler(CommandHandler("history", self.handle_history_command))
+            # Only the configured chat reaches the command handlers; anything else is
+            # dropped by the dispatcher and just logged
+            auth = filters.Chat(chat_id=self._authorized_chat_id)
+            commands = [
+                ("start", self.handle_start_command),
+                ("help", self.handle_help_command),
+                ("status", self.handle_status_command),
+                ("confirm", self.handle_confirm_command),
+                ("enable", self.handle_enable_command),
+                ("disable", self.handle_disable_command),
+                ("price", self.handle_price_command),
+                ("balance", self.handle_balance_command),
+                ("history", self.handle_history_command),
+            ]
+            commands += [(spec.command, functools.partial(self._handle_buy_generic, spec=spec)) for spec in BUY_SPECS.values()]
+            for command, callback in commands:
+                self.application.add_handler(CommandHandler(command, callback, filters=auth))
+            self.application.add_handler(MessageHandler(filters.COMMAND & ~auth, self._log_unauthorized))
+            self.application.add_error_handler(self._on_error)
             
             # Test the connection and verify chat
             logger.info("Testing Telegram bot connection...")
-            bot_info = self.telegram_bot.get_me()
-            logger.info(f"Telegram bot connection successful. Bot username: @{bot_info.username}")
+            await self.application.initialize()
+            bot_info = await self.telegram_bot.get_me()
+            logger.info("Telegram bot connection successful. Bot username: @%s", bot_info.username)
             
             # Verify chat access and send startup notification if not sent yet
             try:
-                startup_message = (
-                    "🔔 Bot is starting up and testing notifications...\n\n"
-                    "Available commands:\n"
-                    "/start - Start the bot and get welcome message\n"
-                    "/help - Show detailed help for all commands\n"
-                    "/buy - Buy BTC with available EUR/USDC\n"
-                    "/buysol - Buy SOL with available EUR/USDC\n"
-                    "/buyeth - Buy ETH with available EUR/USDC\n"
-                    "/buyusdc - Buy USDC with EUR\n"
-                    "/price - Check current prices\n"
-                    "/balance - Check your balances\n"
-                    "/status - Check bot status and all balances\n"
-                    "/history - View recent trading history\n"
-                    "/enable - Enable bot scheduling\n"
-                    "/disable - Disable bot scheduling"
-                )
-                
                 if not self._startup_notification_sent:
-                    self.telegram_bot.send_message(
-                        chat_id=NOTIFICATION_CONFIG['telegram_chat_id'],
-                        text=startup_message
-                    )
+                    await self._send(text=_STARTING_UP_MESSAGE)
                     self._startup_notification_sent = True
                     logger.info("Startup notification sent successfully")
                 else:
@@ -165,201 +522,271 @@ class NotificationManager:
                 
                 logger.info("Successfully verified chat access")
                 
-                # Start polling in a separate thread if not already running
-                if self._polling_thread is None or not self._polling_thread.is_alive():
-                    self._polling_thread = threading.Thread(target=self._start_polling, daemon=True)
-                    self._polling_thread.start()
-                    logger.info("Started new polling thread")
+                await self.application.start()
+                if self._webhook_url:
+                    # Telegram pushes updates to us, so nothing waits on getUpdates
+                    logger.info("Starting Telegram webhook on port %s...", self._webhook_port)
+                    await self.application.updater.start_webhook(
+                        listen=self._webhook_listen,
+                        port=self._webhook_port,
+                        url_path=NOTIFICATION_CONFIG['telegram_token'],
+                        webhook_url=f"{self._webhook_url.rstrip('/')}/{NOTIFICATION_CONFIG['telegram_token']}",
+                        secret_token=self._webhook_secret or None,
+                        drop_pending_updates=True,
+                    )
+                    logger.info("Telegram webhook started successfully")
+                else:
+                    # Start long polling on the running event loop: getUpdates parks on
+                    # Telegram's side for up to `timeout` seconds and returns as soon as
+                    # an update arrives, so there's no need to re-poll between requests
+                    logger.info("Starting Telegram bot polling...")
+                    await self.application.updater.start_polling(drop_pending_updates=True, poll_interval=0, timeout=30)
+                    logger.info("Telegram bot polling started successfully")
                 
                 self.initialized = True
+                self._ready = True
                 logger.info("Telegram bot initialization completed successfully")
                 
             except BadRequest as e:
                 if "chat not found" in str(e).lower():
                     logger.error(
-                        f"Chat not found. Please make sure:\n"
-                        f"1. You have started a chat with @{bot_info.username}\n"
-                        f"2. The chat ID {NOTIFICATION_CONFIG['telegram_chat_id']} is correct\n"
-                        f"3. You have sent at least one message to the bot"
+                        "Chat not found. Please make sure:\n"
+                        "1. You have started a chat with @%s\n"
+                        "2. The chat ID %s is correct\n"
+                        "3. You have sent at least one message to the bot",
+                        bot_info.username, self._authorized_chat_id
                     )
                 else:
-                    logger.error(f"Failed to verify chat access: {e}")
+                    logger.error("Failed to verify chat access: %s", e)
                 return
             except NetworkError as e:
-                logger.error(f"Network error during initialization: {e}")
+                logger.error("Network error during initialization: %s", e)
                 return
             except Exception as e:
-                logger.error(f"Unexpected error verifying chat access: {e}")
+                logger.error("Unexpected error verifying chat access: %s", e)
                 return
                 
         except TelegramError as e:
-            logger.error(f"Failed to initialize Telegram bot: {e}")
+            logger.error("Failed to initialize Telegram bot: %s", e)
+        except Exception as e:
+            logger.error("Unexpected error initializing Telegram bot: %s", e)
+
+    async def _log_unauthorized(self, update, context):
+        """Log commands from chats other than the authorized one"""
+        logger.warning("Unauthorized access attempt from chat ID: %s", update.effective_chat.id)
+
+    async def _on_error(self, update, context):
+        """Application-wide error handler for exceptions a command handler didn't catch"""
+        logger.error("Unhandled error in command handler: %s", context.error, exc_info=context.error)
+        if isinstance(update, Update) and update.message:
+            await self._reply_safe(update, "❌ An error occurred. Please try again.")
+
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _reply_safe(self, update, text):
+        """Reply on an error path, logging instead of raising if the reply itself fails"""
+        try:
+            # Bounded so a dead Telegram connection can't stall the handler
+            await asyncio.wait_for(update.message.reply_text(text), timeout=2.0)
         except Exception as e:
-            logger.error(f"Unexpected error initializing Telegram bot: {e}")
-
-    def _check_command_cooldown(self):
-        """Check if enough time has passed since the last command"""
-        current_time = time.time()
-        time_since_last = current_time - self._last_command_time
-        if time_since_last < self._command_cooldown:
-            logger.debug(f"Command cooldown active. Time since last command: {time_since_last:.2f}s")
+            logger.error("Failed to send error message: %s", e)
+
+    def _check_command_cooldown(self, chat_id):
+        """Check if the chat's command rate limit allows another command
+
+        Rate-limited commands are dropped without a reply so a flood of
+        commands doesn't turn into a flood of outgoing messages.
+        """
+        bucket = self._command_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._command_buckets[chat_id] = TokenBucket(self._command_rate, self._command_burst)
+        if not bucket.consume():
+            logger.debug("Command rate limit exceeded for chat %s, dropping command", chat_id)
             return False
-        self._last_command_time = current_time
-        logger.debug("Command cooldown passed, allowing command")
+        self._last_command_time = time.monotonic()
+        logger.debug("Command rate limit passed, allowing command")
         return True
 
-    def _get_loop(self):
-        """Get or create the event loop"""
-        if self._loop is None or self._loop.is_closed():
-            self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
-        return self._loop
+    async def _cached(self, key, ttl, fn, *args):
+        """Return the cached result of fn(*args) if it is younger than ttl seconds, otherwise refetch it
 
-    def handle_status_command(self, update, context):
+        fn is an async Kraken client method. Concurrent callers that miss on the
+        same key wait for a single fetch.
+        """
+        entry = self._cache_lookup(key, ttl)
+        if entry is not None:
+            return entry[1]
+        lock = self._kraken_cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._cache_lookup(key, ttl)
+            if entry is not None:
+                return entry[1]
+            value = await self._kraken_call(fn, *args)
+            self._kraken_cache[key] = (time.monotonic(), value)
+            return value
+
+    def _cache_lookup(self, key, ttl):
+        """Return the (timestamp, value) cache entry for key if it is younger than ttl seconds"""
+        entry = self._kraken_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry
+        return None
+
+    async def _kraken_call(self, fn, *args, **kwargs):
+        """Await a Kraken call once the shared API budget allows it"""
+        await self._kraken_bucket.acquire()
+        return await fn(*args, **kwargs)
+
+    def _streamed_ticker(self, symbol):
+        """Return the price feed's ticker for symbol unless it's missing or older than _price_max_age"""
+        entry = self._prices.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < self._price_max_age:
+            return entry[1]
+        return None
+
+    async def _ticker(self, symbol):
+        """Return the ticker for symbol, shared between commands for a few seconds"""
+        if DRY_RUN_OFFLINE:
+            return DRY_RUN_FIXTURES['tickers'][symbol]
+        ticker = self._streamed_ticker(symbol)
+        if ticker is not None:
+            return ticker
+        return await self._cached(symbol, self._kraken_cache_ttl, kraken.fetch_ticker, symbol)
+
+    async def _tickers(self, symbols):
+        """Return the tickers for symbols in order, fetching the ones not already at hand in one request"""
+        if DRY_RUN_OFFLINE:
+            return [DRY_RUN_FIXTURES['tickers'][symbol] for symbol in symbols]
+        ttl = self._kraken_cache_ttl
+        # Sorted so concurrent batches take the per-symbol locks in the same order
+        missing = sorted(
+            symbol for symbol in set(symbols)
+            if self._streamed_ticker(symbol) is None and self._cache_lookup(symbol, ttl) is None
+        )
+        if len(missing) > 1 and self._batch_tickers:
+            # Hold the same locks _cached uses, so a concurrent command waits for this
+            # batch instead of sending its own
+            async with contextlib.AsyncExitStack() as stack:
+                for symbol in missing:
+                    await stack.enter_async_context(self._kraken_cache_locks.setdefault(symbol, asyncio.Lock()))
+                missing = [symbol for symbol in missing if self._cache_lookup(symbol, ttl) is None]
+                if len(missing) > 1:
+                    try:
+                        fetched = await self._kraken_call(kraken.fetch_tickers, missing)
+                    except ccxt.NotSupported:
+                        # Fall back to one request per symbol from now on
+                        self._batch_tickers = False
+                    else:
+                        now = time.monotonic()
+                        for symbol in missing:
+                            if symbol in fetched:
+                                self._kraken_cache[symbol] = (now, fetched[symbol])
+        # Anything the batch didn't return is fetched on its own
+        return await asyncio.gather(*(self._ticker(symbol) for symbol in symbols))
+
+    async def _balance(self):
+        """Return the account balance, shared between commands for a few seconds"""
+        if DRY_RUN_OFFLINE:
+            return DRY_RUN_FIXTURES['balance']
+        return await self._cached('balance', self._kraken_cache_ttl, kraken.fetch_balance)
+
+    async def _closed_orders(self, limit):
+        """Return the most recent closed orders"""
+        if DRY_RUN_OFFLINE:
+            return DRY_RUN_FIXTURES['closed_orders'][:limit]
+        return await self._kraken_call(kraken.fetch_closed_orders, limit=limit)
+
+    @command_handler("❌ Error executing status command")
+    async def handle_status_command(self, update, context):
         """Handle the /status command with detailed status reporting"""
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+        logger.info("Status command received from chat ID: %s", update.effective_chat.id)
 
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Status command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
+        # Send initial response
+        # The placeholder is edited into the full status once the data is in
+        placeholder = await update.message.reply_text("🔄 Fetching detailed status information...")
 
-            if str(update.effective_chat.id) != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {update.effective_chat.id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Import here to avoid circular import
-            from shared import kraken, DRY_RUN
-
-            logger.info(f"Status command received from chat ID: {update.effective_chat.id}")
-            
-            # Send initial response
-            update.message.reply_text("🔄 Fetching detailed status information...")
-            
-            try:
-                # Fetch all required data
-                logger.info("Fetching balance from Kraken...")
-                balance = kraken.fetch_balance()
-                
-                # Get balances
-                usdc_balance = balance.get('total', {}).get('USDC.F', 0)
-                btc_balance = balance.get('total', {}).get('XBT.F', 0)
-                eth_balance = balance.get('total', {}).get('ETH.F', 0)
-                sol_balance = balance.get('total', {}).get('SOL', 0)
-                eur_balance = balance.get('total', {}).get('EUR', 0)
-                
-                # Get current prices for value calculation only
-                btc_eur = kraken.fetch_ticker('BTC/EUR')['last']
-                eth_eur = kraken.fetch_ticker('ETH/EUR')['last']
-                sol_eur = kraken.fetch_ticker('SOL/EUR')['last']
-                usdc_eur = kraken.fetch_ticker('USDC/EUR')['last']
-                
-                # Calculate values in EUR
-                btc_eur_value = btc_balance * btc_eur
-                eth_eur_value = eth_balance * eth_eur
-                sol_eur_value = sol_balance * sol_eur
-                usdc_eur_value = usdc_balance * usdc_eur
-                
-                # Get recent trades
-                recent_trades = kraken.fetch_closed_orders(limit=3)  # Last 3 trades
-                
-                # Calculate total portfolio value
-                total_eur_value = (eur_balance + btc_eur_value + eth_eur_value + sol_eur_value + usdc_eur_value)
-                
-                # Prepare status message
-                status_msg = (
-                    "🤖 Detailed Bot Status\n\n"
-                    f"🔹 System Status:\n"
-                    f"• Mode: {'🟡 DRY RUN' if DRY_RUN else '🟢 LIVE'}\n"
-                    f"• Bot State: {'🟢 Running' if self.updater and self.updater.running else '🔴 Stopped'}\n"
-                    f"• Scheduling: {'🟢 Enabled' if self._scheduling_enabled else '🔴 Disabled'}\n"
-                    f"• Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-                    
-                    f"🔹 Portfolio Balances:\n"
-                    f"EUR: {eur_balance:.2f} EUR\n"
-                    f"USDC: {usdc_balance:.2f} USDC (≈ {usdc_eur_value:.2f} EUR)\n"
-                    f"BTC: {btc_balance:.8f} BTC (≈ {btc_eur_value:.2f} EUR)\n"
-                    f"ETH: {eth_balance:.8f} ETH (≈ {eth_eur_value:.2f} EUR)\n"
-                    f"SOL: {sol_balance:.8f} SOL (≈ {sol_eur_value:.2f} EUR)\n\n"
-                    
-                    f"🔹 Total Portfolio Value:\n"
-                    f"• {total_eur_value:.2f} EUR\n\n"
-                )
-                
-                # Add recent trades if available
-                if recent_trades:
-                    status_msg += "🔹 Recent Trades:\n"
-                    for trade in recent_trades:
-                        symbol = trade['symbol']
-                        side = "Buy" if trade['side'] == 'buy' else "Sell"
-                        amount = float(trade['amount'])
-                        price = float(trade['price'])
-                        cost = amount * price
-                        status = trade['status']
-                        timestamp = datetime.fromtimestamp(trade['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        status_msg += (
-                            f"• {side} {symbol}\n"
-                            f"  Amount: {amount:.8f}\n"
-                            f"  Price: {price:.2f}\n"
-                            f"  Total: {cost:.2f}\n"
-                            f"  Status: {status}\n"
-                            f"  Time: {timestamp}\n\n"
-                        )
-                else:
-                    status_msg += "🔹 Recent Trades: No recent trades found\n\n"
-                
-                # Add system information
-                status_msg += (
-                    "🔹 System Information:\n"
-                    f"• Command Cooldown: {self._command_cooldown} seconds\n"
-                    f"• Price Check Cooldown: {self._price_check_cooldown} seconds\n"
-                    f"• Bot Uptime: {self._get_bot_uptime()}\n"
-                    f"• Last Command: {self._get_last_command_time()}\n"
-                )
-                
-                # Send the status message
-                logger.info("Sending detailed status message to Telegram")
-                update.message.reply_text(status_msg)
-                logger.info("Status command executed successfully")
-                
-            except Exception as e:
-                error_msg = f"❌ Error fetching status information: {str(e)}"
-                logger.error(f"Error in status command: {error_msg}", exc_info=True)
-                update.message.reply_text(
-                    f"❌ Error fetching status information:\n"
-                    f"Error: {str(e)}\n\n"
-                    f"Bot is still running in {'DRY RUN' if DRY_RUN else 'LIVE'} mode.\n"
-                    f"Please try again in a few moments."
+        try:
+            # Fetch the balance, current prices and recent trades concurrently so
+            # the total wait is one round trip instead of six
+            logger.info("Fetching balance, prices and trades from Kraken...")
+            balance, recent_trades, tickers = await asyncio.gather(
+                self._balance(),
+                self._closed_orders(3),  # Last 3 trades
+                self._tickers(PORTFOLIO_SYMBOLS),
+            )
+            portfolio = _portfolio(balance, tickers)
+
+            # Add recent trades if available
+            if recent_trades:
+                trades_msg = "🔹 Recent Trades:\n" + "".join(
+                    TRADE_TEMPLATE.format_map({
+                        'side': "Buy" if trade['side'] == 'buy' else "Sell",
+                        'symbol': trade['symbol'],
+                        'amount': float(trade['amount']),
+                        'price': float(trade['price']),
+                        'cost': float(trade['amount']) * float(trade['price']),
+                        'status': trade['status'],
+                        'ts': _order_ts(trade['timestamp']),
+                    })
+                    for trade in recent_trades
                 )
-                
+            else:
+                trades_msg = "🔹 Recent Trades: No recent trades found\n\n"
+
+            status_msg = STATUS_TEMPLATE.format_map({
+                'mode': '🟡 DRY RUN' if DRY_RUN else '🟢 LIVE',
+                'running': '🟢 Running' if self.application and self.application.updater.running else '🔴 Stopped',
+                'scheduling': '🟢 Enabled' if self._scheduling_event.is_set() else '🔴 Disabled',
+                'ts': _now_ts(),
+                **portfolio,
+                'trades': trades_msg,
+                'burst': self._command_burst,
+                'refill': 1 / self._command_rate,
+                'price_cooldown': self._price_check_cooldown,
+                'uptime': self._get_bot_uptime(),
+                'last_command': self._get_last_command_time(),
+            })
+
+            # Send the status message
+            logger.info("Sending detailed status message to Telegram")
+            await context.bot.edit_message_text(
+                chat_id=placeholder.chat_id,
+                message_id=placeholder.message_id,
+                text=status_msg
+            )
+            logger.info("Status command executed successfully")
+
         except Exception as e:
-            error_msg = f"❌ Error in status command: {str(e)}"
-            logger.error(f"Unexpected error in status command: {error_msg}", exc_info=True)
+            error_msg = f"❌ Error fetching status information: {str(e)}"
+            logger.error("Error in status command: %s", error_msg, exc_info=True)
+            error_text = STATUS_ERROR_TEMPLATE.format_map({
+                'error': e,
+                'mode': 'DRY RUN' if DRY_RUN else 'LIVE',
+            })
+            # Replace the placeholder like the success path does; only send a new
+            # message if the edit itself fails
             try:
-                update.message.reply_text(
-                    f"❌ Error executing status command:\n"
-                    f"Error: {str(e)}\n\n"
-                    f"Please try again in a few moments."
-                )
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}", exc_info=True)
+                await asyncio.wait_for(context.bot.edit_message_text(
+                    chat_id=placeholder.chat_id,
+                    message_id=placeholder.message_id,
+                    text=error_text
+                ), timeout=2.0)
+            except Exception as edit_error:
+                logger.error("Failed to edit status placeholder: %s", edit_error)
+                await self._reply_safe(update, error_text)
 
     def _get_bot_uptime(self):
         """Calculate and format the bot's uptime"""
-        if not hasattr(self, '_start_time'):
-            self._start_time = time.time()
-        
-        uptime_seconds = int(time.time() - self._start_time)
-        days = uptime_seconds // (24 * 3600)
-        hours = (uptime_seconds % (24 * 3600)) // 3600
-        minutes = (uptime_seconds % 3600) // 60
-        seconds = uptime_seconds % 60
-        
+        uptime_seconds = int(time.monotonic() - self._start_monotonic)
+        days, rem = divmod(uptime_seconds, 86400)
+        hours, rem = divmod(rem, 3600)
+        minutes, seconds = divmod(rem, 60)
+
         if days > 0:
             return f"{days}d {hours}h {minutes}m {seconds}s"
         elif hours > 0:
@@ -371,795 +798,412 @@ class NotificationManager:
 
     def _get_last_command_time(self):
         """Format the last command time"""
-        if self._last_command_time == 0:
+        if self._last_command_time is None:
             return "No commands executed yet"
-        
-        last_command = datetime.fromtimestamp(self._last_command_time)
-        now = datetime.now()
-        diff = now - last_command
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return f"{diff.seconds} seconds ago"
-
-    def _parse_buy_command(self, args):
-        """Parse buy command arguments
-        Returns: (amount, currency, is_percentage) or (None, None, None) if invalid
-        """
-        if not args:
-            return None, None, None
-            
-        try:
-            # Parse amount
-            amount_str = args[0].strip()
-            is_percentage = False
-            
-            # Check if amount is a percentage
-            if amount_str.endswith('%'):
-                is_percentage = True
-                amount_str = amount_str[:-1]
-            
-            amount = float(amount_str)
-            if amount <= 0:
-                return None, None, None
-                
-            # Parse currency if provided
-            currency = None
-            if len(args) > 1:
-                currency = args[1].strip().upper()
-                if currency not in ['EUR', 'USDC']:
-                    return None, None, None
-                    
-            return amount, currency, is_percentage
-        except (ValueError, IndexError):
-            return None, None, None
-
-    def handle_buy_command(self, update: Update, context: CallbackContext):
-        """Handle the /buy command with confirmation"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
-
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Buy command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
-
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Parse command arguments
-            args = context.args if context.args else []
-            amount, currency, is_percentage = self._parse_buy_command(args)
-            
-            if amount is None:
-                update.message.reply_text(
-                    "❌ Invalid command format. Use:\n"
-                    "/buy [amount] [currency]\n"
-                    "Examples:\n"
-                    "/buy 100 EUR\n"
-                    "/buy 50 USDC\n"
-                    "/buy 25% EUR"
-                )
-                return
-
-            # Store command details
-            self._pending_buy_confirmation[chat_id] = (time.time(), 'buy', amount, currency, is_percentage)
-            
-            # Format confirmation message
-            amount_str = f"{amount}%" if is_percentage else f"{amount:.2f}"
-            currency_str = f" {currency}" if currency else " available EUR/USDC"
-            update.message.reply_text(
-                f"⚠️ Are you sure you want to execute a buy order for {amount_str}{currency_str}?\n"
-                "Reply with /confirm within 30 seconds to proceed."
-            )
-            logger.info(f"Buy confirmation requested for chat {chat_id}: {amount_str}{currency_str}")
-        except Exception as e:
-            error_msg = f"❌ Error preparing buy order: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
-
-    def handle_buy_sol_command(self, update: Update, context: CallbackContext):
-        """Handle the /buysol command with confirmation"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Buy SOL command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Parse command arguments
-            args = context.args if context.args else []
-            amount, currency, is_percentage = self._parse_buy_command(args)
-            
-            if amount is None:
-                update.message.reply_text(
-                    "❌ Invalid command format. Use:\n"
-                    "/buysol [amount] [currency]\n"
-                    "Examples:\n"
-                    "/buysol 100 EUR\n"
-                    "/buysol 50 USDC\n"
-                    "/buysol 25% EUR"
-                )
-                return
-
-            # Store command details
-            self._pending_buy_confirmation[chat_id] = (time.time(), 'buysol', amount, currency, is_percentage)
-            
-            # Format confirmation message
-            amount_str = f"{amount}%" if is_percentage else f"{amount:.2f}"
-            currency_str = f" {currency}" if currency else " available EUR/USDC"
-            update.message.reply_text(
-                f"⚠️ Are you sure you want to execute a SOL buy order for {amount_str}{currency_str}?\n"
-                "Reply with /confirm within 30 seconds to proceed."
-            )
-            logger.info(f"Buy SOL confirmation requested for chat {chat_id}: {amount_str}{currency_str}")
-        except Exception as e:
-            error_msg = f"❌ Error preparing SOL buy order: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
-
-    def handle_buy_eth_command(self, update: Update, context: CallbackContext):
-        """Handle the /buyeth command with confirmation"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Buy ETH command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Parse command arguments
-            args = context.args if context.args else []
-            amount, currency, is_percentage = self._parse_buy_command(args)
-            
-            if amount is None:
-                update.message.reply_text(
-                    "❌ Invalid command format. Use:\n"
-                    "/buyeth [amount] [currency]\n"
-                    "Examples:\n"
-                    "/buyeth 100 EUR\n"
-                    "/buyeth 50 USDC\n"
-                    "/buyeth 25% EUR"
-                )
-                return
-
-            # Store command details
-            self._pending_buy_confirmation[chat_id] = (time.time(), 'buyeth', amount, currency, is_percentage)
-            
-            # Format confirmation message
-            amount_str = f"{amount}%" if is_percentage else f"{amount:.2f}"
-            currency_str = f" {currency}" if currency else " available EUR/USDC"
-            update.message.reply_text(
-                f"⚠️ Are you sure you want to execute an ETH buy order for {amount_str}{currency_str}?\n"
-                "Reply with /confirm within 30 seconds to proceed."
-            )
-            logger.info(f"Buy ETH confirmation requested for chat {chat_id}: {amount_str}{currency_str}")
-        except Exception as e:
-            error_msg = f"❌ Error preparing ETH buy order: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
-
-    def handle_buy_usdc_command(self, update: Update, context: CallbackContext):
-        """Handle the /buyusdc command with confirmation"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Buy USDC command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Parse command arguments
-            args = context.args if context.args else []
-            amount, currency, is_percentage = self._parse_buy_command(args)
-            
-            if amount is None:
-                update.message.reply_text(
-                    "❌ Invalid command format. Use:\n"
-                    "/buyusdc [amount] [currency]\n"
-                    "Examples:\n"
-                    "/buyusdc 100 EUR\n"
-                    "/buyusdc 25% EUR"
-                )
-                return
 
-            # USDC can only be bought with EUR
-            if currency and currency != 'EUR':
-                update.message.reply_text("❌ USDC can only be bought with EUR")
-                return
-
-            # Store command details
-            self._pending_buy_confirmation[chat_id] = (time.time(), 'buyusdc', amount, 'EUR', is_percentage)
-            
-            # Format confirmation message
-            amount_str = f"{amount}%" if is_percentage else f"{amount:.2f}"
-            update.message.reply_text(
-                f"⚠️ Are you sure you want to execute a USDC buy order for {amount_str} EUR?\n"
-                "Reply with /confirm within 30 seconds to proceed."
+        elapsed = int(time.monotonic() - self._last_command_time)
+        if elapsed >= 86400:
+            return f"{elapsed // 86400} days ago"
+        elif elapsed > 3600:
+            return f"{elapsed // 3600} hours ago"
+        elif elapsed > 60:
+            return f"{elapsed // 60} minutes ago"
+        else:
+            return f"{elapsed} seconds ago"
+
+    @command_handler("❌ Error preparing buy order")
+    async def _handle_buy_generic(self, update: Update, context: CallbackContext, spec):
+        """Handle a /buy* command described by spec, asking for confirmation before buying"""
+        chat_id = update.effective_chat.id
+        amount, currency, is_percentage = _parse_buy_command(tuple(context.args or ()))
+
+        if amount is None:
+            examples = [f"/{spec.command} 100 EUR"]
+            if 'USDC' in spec.currencies:
+                examples.append(f"/{spec.command} 50 USDC")
+            examples.append(f"/{spec.command} 25% EUR")
+            await update.message.reply_text(
+                "❌ Invalid command format. Use:\n"
+                f"/{spec.command} [amount] [currency]\n"
+                "Examples:\n" + "\n".join(examples)
             )
-            logger.info(f"Buy USDC confirmation requested for chat {chat_id}: {amount_str} EUR")
-        except Exception as e:
-            error_msg = f"❌ Error preparing USDC buy order: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
+            return
 
-    def handle_confirm_command(self, update: Update, context: CallbackContext):
+        if currency and currency not in spec.currencies:
+            await update.message.reply_text(f"❌ {spec.asset} can only be bought with {' or '.join(spec.currencies)}")
+            return
+        if len(spec.currencies) == 1:
+            currency = spec.currencies[0]
+
+        # Store command details
+        self._pending_buy_confirmation[chat_id] = (spec.command, amount, currency, is_percentage)
+
+        # Format confirmation message
+        amount_str = f"{amount}%" if is_percentage else f"{amount:.2f}"
+        currency_str = f" {currency}" if currency else " available EUR/USDC"
+        await update.message.reply_text(
+            f"⚠️ Are you sure you want to execute {spec.order} for {amount_str}{currency_str}?\n"
+            "Reply with /confirm within 30 seconds to proceed."
+        )
+        logger.info("%s confirmation requested for chat %s: %s%s", spec.log_name, chat_id, amount_str, currency_str)
+
+    @command_handler("❌ Error executing buy order", require_cooldown=False)
+    async def handle_confirm_command(self, update: Update, context: CallbackContext):
         """Handle the /confirm command to execute a pending buy"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            pending = self._pending_buy_confirmation.get(chat_id)
-            if not pending:
-                update.message.reply_text("❌ No pending buy order to confirm or confirmation timed out.")
-                logger.info(f"No pending buy order or confirmation timed out for chat {chat_id}")
-                return
-            ts, command_type, amount, currency, is_percentage = pending
-            if (time.time() - ts) > 30:
-                update.message.reply_text("❌ Confirmation timed out. Please try again.")
-                logger.info(f"Confirmation timed out for chat {chat_id}")
-                self._pending_buy_confirmation.pop(chat_id, None)
-                return
-            self._pending_buy_confirmation.pop(chat_id, None)
-            # Determine which callback to use based on the stored command type
-            if command_type == 'buysol':
-                callback = self._buy_sol_callback
-            elif command_type == 'buyeth':
-                callback = self._buy_eth_callback
-            elif command_type == 'buyusdc':
-                callback = self._buy_usdc_callback
-            else:
-                callback = self._buy_callback
-            if not callback:
-                update.message.reply_text("❌ Buy functionality not initialized. Please contact the administrator.")
-                logger.error("Buy callback not set")
-                return
-            update.message.reply_text("🔄 Confirmed. Initiating buy order...")
-            logger.info(f"Buy confirmed by chat {chat_id}, initiating {command_type} order...")
-            from shared import get_event_loop
-            loop = get_event_loop()
-            asyncio.run_coroutine_threadsafe(callback(amount, currency, is_percentage), loop)
-            update.message.reply_text("✅ Buy order process initiated. Check the logs for details.")
-            logger.info(f"{command_type} command executed successfully")
-        except Exception as e:
-            error_msg = f"❌ Error executing buy order: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
-
-    def handle_enable_command(self, update: Update, context: CallbackContext):
-        """Handle the /enable command to enable bot scheduling"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+        chat_id = update.effective_chat.id
+        pending = self._pending_buy_confirmation.pop(chat_id, None)
+        if not pending:
+            await update.message.reply_text("❌ No pending buy order to confirm or confirmation timed out.")
+            logger.info("No pending buy order or confirmation timed out for chat %s", chat_id)
+            return
+        command_type, amount, currency, is_percentage = pending
+        callback = self._callbacks.get(command_type)
+        if not callback:
+            await update.message.reply_text("❌ Buy functionality not initialized. Please contact the administrator.")
+            logger.error("Buy callback not set")
+            return
+        logger.info("Buy confirmed by chat %s, initiating %s order...", chat_id, command_type)
+        self._spawn(callback(amount, currency, is_percentage))
+        await update.message.reply_text("✅ Confirmed. Buy order process initiated. Check the logs for details.")
+        logger.info("%s command executed successfully", command_type)
+
+    async def _handle_scheduling_command(self, update, enable):
+        """Shared flow for /enable and /disable"""
+        reply = update.message.reply_text
+        event = self._scheduling_event
+        state = "enabled" if enable else "disabled"
+        if event.is_set() == enable:
+            await reply(f"ℹ️ Bot scheduling is already {state}.")
+            return
 
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Enable command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
+        callback = self._callbacks.get('scheduling_state')
+        if not callback:
+            await reply("❌ Bot scheduling control not initialized. Please contact the administrator.")
+            logger.error("Scheduling state callback not set")
+            return
 
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
+        if enable:
+            event.set()
+        else:
+            event.clear()
+        callback(enable)
 
-            if self._scheduling_enabled:
-                update.message.reply_text("ℹ️ Bot scheduling is already enabled.")
-                return
+        await reply(f"✅ Bot scheduling has been {state}.")
+        logger.info("Bot scheduling %s by chat %s", state, update.effective_chat.id)
 
-            if not self._scheduling_state_callback:
-                update.message.reply_text("❌ Bot scheduling control not initialized. Please contact the administrator.")
-                logger.error("Scheduling state callback not set")
-                return
+        self.notify(f"Bot scheduling has been {state}.", "INFO" if enable else "WARNING")
 
-            # Enable scheduling
-            self._scheduling_enabled = True
-            self._scheduling_state_callback(True)
-            
-            update.message.reply_text("✅ Bot scheduling has been enabled.")
-            logger.info(f"Bot scheduling enabled by chat {chat_id}")
-            
-            # Send notification about the change
-            asyncio.run_coroutine_threadsafe(
-                self.send_notification("Bot scheduling has been enabled.", "INFO"),
-                self._get_loop()
-            )
-            
-        except Exception as e:
-            error_msg = f"❌ Error enabling bot scheduling: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
+    @command_handler("❌ Error enabling bot scheduling")
+    async def handle_enable_command(self, update: Update, context: CallbackContext):
+        """Handle the /enable command to enable bot scheduling"""
+        await self._handle_scheduling_command(update, enable=True)
 
-    def handle_disable_command(self, update: Update, context: CallbackContext):
+    @command_handler("❌ Error disabling bot scheduling")
+    async def handle_disable_command(self, update: Update, context: CallbackContext):
         """Handle the /disable command to disable bot scheduling"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+        await self._handle_scheduling_command(update, enable=False)
 
-            if not self.initialized or not self.updater or not self.updater.running:
-                logger.warning("Disable command received but bot not properly initialized")
-                update.message.reply_text("❌ Bot is not fully initialized yet. Please wait a moment and try again.")
-                return
-
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            if not self._scheduling_enabled:
-                update.message.reply_text("ℹ️ Bot scheduling is already disabled.")
-                return
+    def register(self, name, callback):
+        """Register a callback: a BUY_SPECS command name for its confirmed order, or 'scheduling_state'"""
+        self._callbacks[name] = callback
 
-            if not self._scheduling_state_callback:
-                update.message.reply_text("❌ Bot scheduling control not initialized. Please contact the administrator.")
-                logger.error("Scheduling state callback not set")
-                return
-
-            # Disable scheduling
-            self._scheduling_enabled = False
-            self._scheduling_state_callback(False)
-            
-            update.message.reply_text("✅ Bot scheduling has been disabled.")
-            logger.info(f"Bot scheduling disabled by chat {chat_id}")
-            
-            # Send notification about the change
-            asyncio.run_coroutine_threadsafe(
-                self.send_notification("Bot scheduling has been disabled.", "WARNING"),
-                self._get_loop()
-            )
-            
-        except Exception as e:
-            error_msg = f"❌ Error disabling bot scheduling: {str(e)}"
-            logger.error(error_msg)
-            try:
-                update.message.reply_text(error_msg)
-            except Exception as reply_error:
-                logger.error(f"Failed to send error message: {reply_error}")
-
-    def set_scheduling_state_callback(self, callback):
-        """Set the callback function to be called when scheduling state changes"""
-        self._scheduling_state_callback = callback
+    def set_scheduling_enabled(self, enabled):
+        """Set the scheduling state without calling the scheduling state callback, e.g. when restoring it on startup"""
+        if enabled:
+            self._scheduling_event.set()
+        else:
+            self._scheduling_event.clear()
 
     def is_scheduling_enabled(self):
         """Check if bot scheduling is currently enabled"""
-        return self._scheduling_enabled
+        return self._scheduling_event.is_set()
 
-    def set_buy_callback(self, callback):
-        """Set the callback function to be called when a buy order is confirmed"""
-        self._buy_callback = callback
+    async def wait_scheduling_enabled(self):
+        """Wait until bot scheduling is enabled; returns immediately if it already is"""
+        await self._scheduling_event.wait()
 
-    def set_buy_sol_callback(self, callback):
-        """Set the callback function to be called when a SOL buy order is confirmed"""
-        self._buy_sol_callback = callback
+    def notify(self, message, level="INFO"):
+        """Queue a notification for the background sender without waiting for delivery
 
-    def set_buy_eth_callback(self, callback):
-        """Set the callback function to be called when an ETH buy order is confirmed"""
-        self._buy_eth_callback = callback
+        Notifications are sent one at a time so bursts don't race each other
+        into Telegram's rate limit. If the queue is full the message is dropped.
+        """
+        try:
+            self._notif_queue.put_nowait((message, level))
+        except asyncio.QueueFull:
+            logger.warning("Notification queue full, dropping: %s", message)
+            return
+        self._start_sender()
 
-    def set_buy_usdc_callback(self, callback):
-        """Set the callback function to be called when a USDC buy order is confirmed"""
-        self._buy_usdc_callback = callback
+    def _start_sender(self):
+        """Start the notification sender task if a loop is running and it isn't already"""
+        if self._notif_task is not None and not self._notif_task.done():
+            return
+        try:
+            self._notif_task = asyncio.get_running_loop().create_task(self._notif_sender())
+        except RuntimeError:
+            # Not on the loop yet; startup_notification() starts the sender
+            pass
+
+    def start_price_feed(self):
+        """Start streaming PRICE_SYMBOLS tickers over Kraken's WebSocket API if enabled"""
+        # Offline dry runs make no Kraken connections at all
+        if not TRADING_CONFIG['price_feed_enabled'] or DRY_RUN_OFFLINE or self._price_feed_tasks:
+            return
+        # Public channel, no credentials needed
+        self._ws_exchange = ccxt.pro.kraken()
+        loop = asyncio.get_running_loop()
+        self._price_feed_tasks = [loop.create_task(self._price_feed(symbol)) for symbol in PRICE_SYMBOLS]
+        logger.info("WebSocket price feed started for %s", ", ".join(PRICE_SYMBOLS))
+
+    async def _price_feed(self, symbol):
+        """Keep self._prices[symbol] current; _ticker falls back to REST while it's missing or stale"""
+        while True:
+            try:
+                ticker = await self._ws_exchange.watch_ticker(symbol)
+                self._prices[symbol] = (time.monotonic(), ticker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._prices.pop(symbol, None)
+                logger.warning("Price feed for %s failed, using REST until it reconnects: %s", symbol, e)
+                await asyncio.sleep(5)
+
+    async def _stop_price_feed(self):
+        """Cancel the price feed tasks and close the WebSocket connection"""
+        for task in self._price_feed_tasks:
+            task.cancel()
+        await asyncio.gather(*self._price_feed_tasks, return_exceptions=True)
+        self._price_feed_tasks = []
+        self._prices.clear()
+        if self._ws_exchange is not None:
+            await self._ws_exchange.close()
+            self._ws_exchange = None
+
+    async def _notif_sender(self):
+        """Deliver queued notifications in order"""
+        queue = self._notif_queue
+        while True:
+            message, level = await queue.get()
+            try:
+                await self.send_notification(message, level)
+            except Exception as e:
+                logger.error("Failed to send queued notification: %s", e)
+            finally:
+                queue.task_done()
 
     async def send_notification(self, message, level="INFO"):
-        """Send a notification to the configured Telegram chat
+        """Send a notification to the configured Telegram chat and email recipient
         
         Args:
             message (str): The message to send
             level (str): The level of the notification (INFO, WARNING, ERROR, SUCCESS)
         """
-        if not NOTIFICATION_CONFIG['telegram_enabled']:
+        sends = []
+        if self._telegram_enabled:
+            sends.append(self._send_telegram(message, level))
+        else:
             logger.debug("Telegram notifications are disabled")
-            return
 
+        if self._email_enabled:
+            sends.append(self._send_email(message, level))
+
+        # Deliver to both channels concurrently; each channel logs its own failures
+        await asyncio.gather(*sends, return_exceptions=True)
+
+    async def _send_telegram(self, message, level="INFO"):
+        """Send a notification to the configured Telegram chat"""
         if not self.initialized or not self.telegram_bot:
-            logger.warning("Attempting to send notification but bot not initialized")
-            await self.initialize()
+            # Concurrent notifications wait for a single re-initialization
+            async with self._init_lock:
+                if not self.initialized or not self.telegram_bot:
+                    logger.warning("Attempting to send notification but bot not initialized")
+                    await self.initialize()
             if not self.initialized or not self.telegram_bot:
                 logger.error("Failed to initialize bot for notification")
                 return
 
         try:
-            # Add emoji based on level
-            emoji = {
-                "INFO": "ℹ️",
-                "WARNING": "⚠️",
-                "ERROR": "❌",
-                "SUCCESS": "✅"
-            }.get(level, "ℹ️")
-
-            formatted_message = f"{emoji} {message}"
+            formatted_message = _LEVEL_PREFIX.get(level, _DEFAULT_LEVEL_PREFIX) + message
             
-            # Send the message using synchronous method
-            self.telegram_bot.send_message(
-                chat_id=NOTIFICATION_CONFIG['telegram_chat_id'],
-                text=formatted_message
-            )
-            logger.info(f"Notification sent successfully: {message}")
+            await self._send(text=formatted_message)
+            logger.debug("Notification sent successfully: %s", message)
             
         except BadRequest as e:
             if "chat not found" in str(e).lower():
                 logger.error(
-                    f"Chat not found. Please make sure:\n"
-                    f"1. You have started a chat with the bot\n"
-                    f"2. The chat ID {NOTIFICATION_CONFIG['telegram_chat_id']} is correct\n"
-                    f"3. You have sent at least one message to the bot"
+                    "Chat not found. Please make sure:\n"
+                    "1. You have started a chat with the bot\n"
+                    "2. The chat ID %s is correct\n"
+                    "3. You have sent at least one message to the bot",
+                    self._authorized_chat_id
                 )
             else:
-                logger.error(f"Failed to send notification: {e}")
+                logger.error("Failed to send notification: %s", e)
         except NetworkError as e:
-            logger.error(f"Network error sending notification: {e}")
+            logger.error("Network error sending notification: %s", e)
         except Exception as e:
-            logger.error(f"Unexpected error sending notification: {e}")
-
-    def handle_start_command(self, update: Update, context: CallbackContext):
-        """Handle the /start command"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
+            logger.error("Unexpected error sending notification: %s", e)
 
-            welcome_message = (
-                "👋 Welcome to the Kraken Trading Bot!\n\n"
-                "This bot helps you manage your cryptocurrency trades on Kraken.\n\n"
-                "🔹 Main Features:\n"
-                "• Buy BTC, ETH, SOL, and USDC\n"
-                "• Check prices and balances\n"
-                "• View trading history\n"
-                "• Automated scheduled trading\n\n"
-                "📝 Quick Start:\n"
-                "1. Use /help to see all available commands\n"
-                "2. Use /price to check current prices\n"
-                "3. Use /balance to check your balances\n"
-                "4. Use /buy, /buysol, /buyeth, or /buyusdc to make trades\n\n"
-                "⚠️ Important:\n"
-                "• All trades require confirmation\n"
-                "• Minimum trade amount is 10 EUR/USDC\n"
-                "• Bot scheduling can be enabled/disabled\n\n"
-                "Need help? Use /help for detailed command information."
-            )
-            update.message.reply_text(welcome_message)
-            logger.info(f"Start command executed for chat {chat_id}")
-        except Exception as e:
-            logger.error(f"Error in start command: {e}")
-            update.message.reply_text("❌ An error occurred. Please try again.")
-
-    def handle_help_command(self, update: Update, context: CallbackContext):
-        """Handle the /help command"""
-        chat_id = str(update.effective_chat.id)
+    async def _send_email(self, message, level="INFO"):
+        """Send a notification email through the configured SMTP server"""
         try:
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            help_message = (
-                "📚 Command Help\n\n"
-                "🔹 Trading Commands:\n"
-                "/buy - Buy BTC\n"
-                "• Uses available EUR or USDC balance\n"
-                "• Requires confirmation\n"
-                "• Minimum 10 EUR/USDC required\n\n"
-                "/buysol - Buy SOL\n"
-                "• Uses available EUR or USDC balance\n"
-                "• Requires confirmation\n"
-                "• Minimum 10 EUR/USDC required\n\n"
-                "/buyeth - Buy ETH\n"
-                "• Uses available EUR or USDC balance\n"
-                "• Requires confirmation\n"
-                "• Minimum 10 EUR/USDC required\n\n"
-                "/buyusdc - Buy USDC\n"
-                "• Uses EUR balance only\n"
-                "• Requires confirmation\n"
-                "• Minimum 10 EUR required\n\n"
-                "🔹 Information Commands:\n"
-                "/price - Check current prices\n"
-                "• Shows BTC, ETH, SOL prices in EUR and USDC\n"
-                "• 10-second cooldown between checks\n\n"
-                "/balance - Check your balances\n"
-                "• Shows available EUR, USDC, BTC, ETH, SOL balances\n"
-                "• Includes approximate values in EUR\n\n"
-                "/status - Full status check\n"
-                "• Shows all balances and current prices\n"
-                "• Includes bot status and scheduling state\n\n"
-                "/history - View trading history\n"
-                "• Shows recent trades and their status\n"
-                "• Includes order details and timestamps\n\n"
-                "🔹 Control Commands:\n"
-                "/enable - Enable bot scheduling\n"
-                "• Enables automatic Monday/Sunday trading\n"
-                "• Requires confirmation\n\n"
-                "/disable - Disable bot scheduling\n"
-                "• Disables automatic trading\n"
-                "• Requires confirmation\n\n"
-                "⚠️ Important Notes:\n"
-                "• All trades require /confirm within 30 seconds\n"
-                "• Minimum trade amount is 10 EUR/USDC\n"
-                "• Price checks have a 10-second cooldown\n"
-                "• Bot scheduling can be enabled/disabled\n"
-                "• All commands are logged for security"
-            )
-            update.message.reply_text(help_message)
-            logger.info(f"Help command executed for chat {chat_id}")
+            msg = EmailMessage()
+            msg['From'] = self._email_from
+            msg['To'] = self._email_to
+            msg['Subject'] = f"Kraken Bot {level} Alert"
+            msg.set_content(message)
+
+            async with self._smtp_lock:
+                smtp = await self._get_smtp_connection()
+                try:
+                    await smtp.send_message(msg)
+                except aiosmtplib.SMTPException:
+                    # Drop the connection so the next email starts from a fresh one
+                    await self._close_smtp_connection()
+                    raise
+            logger.debug("Email notification sent successfully: %s", message)
+        except aiosmtplib.SMTPException as e:
+            logger.error("Failed to send email notification: %s", e)
         except Exception as e:
-            logger.error(f"Error in help command: {e}")
-            update.message.reply_text("❌ An error occurred. Please try again.")
+            logger.error("Unexpected error sending email notification: %s", e)
 
-    def handle_price_command(self, update: Update, context: CallbackContext):
-        """Handle the /price command to check current prices"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+    async def _get_smtp_connection(self):
+        """Return the persistent SMTP connection, reconnecting only if it has dropped
 
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
-
-            # Check price check cooldown
-            last_check = self._last_price_check.get(chat_id, 0)
-            if time.time() - last_check < self._price_check_cooldown:
-                remaining = int(self._price_check_cooldown - (time.time() - last_check))
-                update.message.reply_text(f"⏳ Please wait {remaining} seconds before checking prices again.")
-                return
-
-            self._last_price_check[chat_id] = time.time()
-
-            # Import here to avoid circular import
-            from shared import kraken
-
-            # Send initial response
-            update.message.reply_text("🔄 Fetching current prices...")
-            
+        Must be called with self._smtp_lock held.
+        """
+        if self._smtp is not None and self._smtp.is_connected:
             try:
-                # Fetch current prices
-                btc_eur = kraken.fetch_ticker('BTC/EUR')['last']
-                btc_usdc = kraken.fetch_ticker('BTC/USDC')['last']
-                eth_eur = kraken.fetch_ticker('ETH/EUR')['last']
-                eth_usdc = kraken.fetch_ticker('ETH/USDC')['last']
-                sol_eur = kraken.fetch_ticker('SOL/EUR')['last']
-                sol_usdc = kraken.fetch_ticker('SOL/USDC')['last']
-                usdc_eur = kraken.fetch_ticker('USDC/EUR')['last']
-
-                price_message = (
-                    "💰 Current Prices:\n\n"
-                    f"Bitcoin (BTC):\n"
-                    f"• {btc_eur:.2f} EUR\n"
-                    f"• {btc_usdc:.2f} USDC\n\n"
-                    f"Ethereum (ETH):\n"
-                    f"• {eth_eur:.2f} EUR\n"
-                    f"• {eth_usdc:.2f} USDC\n\n"
-                    f"Solana (SOL):\n"
-                    f"• {sol_eur:.2f} EUR\n"
-                    f"• {sol_usdc:.2f} USDC\n\n"
-                    f"USDC:\n"
-                    f"• {usdc_eur:.4f} EUR\n\n"
-                    f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-                update.message.reply_text(price_message)
-                logger.info(f"Price command executed successfully for chat {chat_id}")
-                
-            except Exception as e:
-                error_msg = f"❌ Error fetching prices: {str(e)}"
-                logger.error(error_msg)
-                update.message.reply_text(error_msg)
-                
-        except Exception as e:
-            logger.error(f"Error in price command: {e}")
-            update.message.reply_text("❌ An error occurred. Please try again.")
-
-    def handle_balance_command(self, update: Update, context: CallbackContext):
-        """Handle the /balance command to check balances"""
-        chat_id = str(update.effective_chat.id)
+                await self._smtp.noop()
+                return self._smtp
+            except aiosmtplib.SMTPException as e:
+                logger.info("SMTP connection is no longer usable, reconnecting: %s", e)
+                await self._close_smtp_connection()
+
+        smtp = aiosmtplib.SMTP(
+            hostname=self._email_server,
+            port=self._email_port,
+            start_tls=True,
+            username=self._email_username,
+            password=self._email_password,
+        )
+        await smtp.connect()  # Also performs STARTTLS and login
+        self._smtp = smtp
+        return smtp
+
+    async def _close_smtp_connection(self):
+        """Close the persistent SMTP connection if one is open"""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None or not smtp.is_connected:
+            return
         try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+            await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
 
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
+    async def handle_start_command(self, update: Update, context: CallbackContext):
+        """Handle the /start command"""
+        await update.message.reply_text(_WELCOME_MESSAGE)
+        logger.info("Start command executed for chat %s", update.effective_chat.id)
 
-            # Import here to avoid circular import
-            from shared import kraken
+    async def handle_help_command(self, update: Update, context: CallbackContext):
+        """Handle the /help command"""
+        await update.message.reply_text(_HELP_MESSAGE)
+        logger.info("Help command executed for chat %s", update.effective_chat.id)
 
-            # Send initial response
-            update.message.reply_text("🔄 Fetching balances...")
-            
-            try:
-                # Fetch balances
-                balance = kraken.fetch_balance()
-                eur_balance = balance['total'].get('EUR', 0)
-                usdc_balance = balance['total'].get('USDC.F', 0)
-                btc_balance = balance['total'].get('XBT.F', 0)
-                eth_balance = balance['total'].get('ETH.F', 0)
-                sol_balance = balance['total'].get('SOL', 0)
-
-                # Get current prices for value calculation
-                btc_eur = kraken.fetch_ticker('BTC/EUR')['last']
-                eth_eur = kraken.fetch_ticker('ETH/EUR')['last']
-                sol_eur = kraken.fetch_ticker('SOL/EUR')['last']
-                usdc_eur = kraken.fetch_ticker('USDC/EUR')['last']
-
-                # Calculate EUR values
-                btc_eur_value = btc_balance * btc_eur
-                eth_eur_value = eth_balance * eth_eur
-                sol_eur_value = sol_balance * sol_eur
-                usdc_eur_value = usdc_balance * usdc_eur
-
-                balance_message = (
-                    "💰 Your Balances:\n\n"
-                    f"EUR: {eur_balance:.2f} EUR\n"
-                    f"USDC: {usdc_balance:.2f} USDC (≈ {usdc_eur_value:.2f} EUR)\n"
-                    f"BTC: {btc_balance:.8f} BTC (≈ {btc_eur_value:.2f} EUR)\n"
-                    f"ETH: {eth_balance:.8f} ETH (≈ {eth_eur_value:.2f} EUR)\n"
-                    f"SOL: {sol_balance:.8f} SOL (≈ {sol_eur_value:.2f} EUR)\n\n"
-                    f"Total Value: {(eur_balance + btc_eur_value + eth_eur_value + sol_eur_value + usdc_eur_value):.2f} EUR\n\n"
-                    f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-                update.message.reply_text(balance_message)
-                logger.info(f"Balance command executed successfully for chat {chat_id}")
-                
-            except Exception as e:
-                error_msg = f"❌ Error fetching balances: {str(e)}"
-                logger.error(error_msg)
-                update.message.reply_text(error_msg)
-                
-        except Exception as e:
-            logger.error(f"Error in balance command: {e}")
-            update.message.reply_text("❌ An error occurred. Please try again.")
+    @command_handler("❌ Error fetching prices")
+    async def handle_price_command(self, update: Update, context: CallbackContext):
+        """Handle the /price command to check current prices"""
+        chat_id = update.effective_chat.id
 
-    def handle_history_command(self, update: Update, context: CallbackContext):
-        """Handle the /history command to view trading history"""
-        chat_id = str(update.effective_chat.id)
-        try:
-            if not self._check_command_cooldown():
-                update.message.reply_text("⏳ Please wait a moment before sending another command.")
-                return
+        # Check price check cooldown
+        last_check = self._last_price_check.get(chat_id, 0)
+        if time.time() - last_check < self._price_check_cooldown:
+            remaining = int(self._price_check_cooldown - (time.time() - last_check))
+            await update.message.reply_text(f"⏳ Please wait {remaining} seconds before checking prices again.")
+            return
 
-            if chat_id != str(NOTIFICATION_CONFIG['telegram_chat_id']):
-                logger.warning(f"Unauthorized access attempt from chat ID: {chat_id}")
-                update.message.reply_text("❌ Unauthorized access. This bot is private.")
-                return
+        self._last_price_check[chat_id] = time.time()
 
-            # Import here to avoid circular import
-            from shared import kraken
+        # Fetch current prices, reusing any fetched by a command in the last few seconds
+        tickers = await self._tickers(PRICE_SYMBOLS)
+        # Unchanged prices (e.g. served from the cache) reuse the formatted body
+        price_message = _format_prices(tuple(t['last'] for t in tickers)) + (
+            f"Last Update: {_now_ts()}"
+        )
+        await update.message.reply_text(price_message)
+        logger.info("Price command executed successfully for chat %s", chat_id)
 
-            # Send initial response
-            update.message.reply_text("🔄 Fetching trading history...")
-            
-            try:
-                # Fetch recent orders
-                orders = kraken.fetch_closed_orders(limit=5)  # Get last 5 closed orders
-                
-                if not orders:
-                    update.message.reply_text("📝 No recent trading history found.")
-                    return
+    @command_handler("❌ Error fetching balances")
+    async def handle_balance_command(self, update: Update, context: CallbackContext):
+        """Handle the /balance command to check balances"""
+        # Fetch balances and current prices, reusing any fetched by a command in the last few seconds
+        balance, tickers = await asyncio.gather(
+            self._balance(),
+            self._tickers(PORTFOLIO_SYMBOLS),
+        )
+        balance_message = BALANCE_TEMPLATE.format_map({**_portfolio(balance, tickers), 'ts': _now_ts()})
+        await update.message.reply_text(balance_message)
+        logger.info("Balance command executed successfully for chat %s", update.effective_chat.id)
+
+    @command_handler("❌ Error fetching trading history")
+    async def handle_history_command(self, update: Update, context: CallbackContext):
+        """Handle the /history command to view trading history"""
+        chat_id = update.effective_chat.id
 
-                history_message = "📝 Recent Trading History:\n\n"
-                
-                for order in orders:
-                    symbol = order['symbol']
-                    side = "Buy" if order['side'] == 'buy' else "Sell"
-                    amount = float(order['amount'])
-                    price = float(order['price'])
-                    cost = amount * price
-                    status = order['status']
-                    timestamp = datetime.fromtimestamp(order['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    history_message += (
-                        f"🔹 {side} {symbol}\n"
-                        f"• Amount: {amount:.8f}\n"
-                        f"• Price: {price:.2f}\n"
-                        f"• Total: {cost:.2f}\n"
-                        f"• Status: {status}\n"
-                        f"• Time: {timestamp}\n\n"
-                    )
+        # Fetch recent orders
+        orders = await self._closed_orders(5)  # Get last 5 closed orders
+        
+        if not orders:
+            await update.message.reply_text("📝 No recent trading history found.")
+            return
 
-                history_message += f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                update.message.reply_text(history_message)
-                logger.info(f"History command executed successfully for chat {chat_id}")
-                
-            except Exception as e:
-                error_msg = f"❌ Error fetching trading history: {str(e)}"
-                logger.error(error_msg)
-                update.message.reply_text(error_msg)
-                
-        except Exception as e:
-            logger.error(f"Error in history command: {e}")
-            update.message.reply_text("❌ An error occurred. Please try again.")
+        history_message = "📝 Recent Trading History:\n\n" + "".join(
+            HISTORY_ENTRY_TEMPLATE.format_map({
+                'side': "Buy" if order['side'] == 'buy' else "Sell",
+                'symbol': order['symbol'],
+                'amount': float(order['amount']),
+                'price': float(order['price']),
+                'cost': float(order['amount']) * float(order['price']),
+                'status': order['status'],
+                'ts': _order_ts(order['timestamp']),
+            })
+            for order in orders
+        ) + f"Last Update: {_now_ts()}"
+        await update.message.reply_text(history_message)
+        logger.info("History command executed successfully for chat %s", chat_id)
 
 # Create a global notification manager instance
 notification_manager = NotificationManager()
 
-# Handle shutdown gracefully
-def signal_handler(signum, frame):
-    logger.info(f"Received signal {signum}, shutting down...")
-    notification_manager.stop()
+def install():
+    """Register SIGINT/SIGTERM handlers that cancel the calling task
+
+    Call once from the coroutine that runs the bot, so its cleanup runs on
+    shutdown. Importing this module installs nothing.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
 
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
+async def startup_notification():
+    """Initialize the Telegram bot, which sends the startup notification
 
-# Send a test notification on startup
-def send_test_notification():
-    """Send a test notification to verify the setup"""
+    Call this once from the bot's running event loop; importing this module
+    does no network I/O.
+    """
     if NOTIFICATION_CONFIG['telegram_enabled']:
         try:
             logger.info("Sending test notification...")
-            asyncio.run(notification_manager.initialize())
-            if notification_manager.initialized and not notification_manager._startup_notification_sent:
-                asyncio.run(notification_manager.send_notification(
-                    "🔔 Bot is ready! Available commands:\n"
-                    "/buy - Trigger a manual BTC buy order\n"
-                    "/buysol - Trigger a SOL buy order\n"
-                    "/buyeth - Trigger a ETH buy order\n"
-                    "/buyusdc - Trigger a USDC buy order\n"
-                    "/status - Check bot status",
-                    "SUCCESS"
-                ))
-                notification_manager._startup_notification_sent = True
+            # Same lock as _send_telegram's re-initialization, so only one Application is built
+            async with notification_manager._init_lock:
+                if not notification_manager.initialized:
+                    await notification_manager.initialize()
+            if notification_manager._startup_notification_sent:
                 logger.info("Test notification sent successfully")
-            else:
-                logger.info("Test notification already sent, skipping")
         except Exception as e:
-            logger.error(f"Failed to send test notification: {e}")
-
-# Run the test notification
-try:
-    send_test_notification()
-except Exception as e:
-    logger.error(f"Error running test notification: {e}") 
\ No newline at end of file
+            logger.error("Failed to send test notification: %s", e)
+    # Deliver anything queued before the loop started, once Telegram is set up
+    notification_manager._start_sender()
\ No newline at end of file
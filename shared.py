@@ -1,9 +1,10 @@
 import os
-import ccxt
-import asyncio
+import ccxt.async_support as ccxt_async
 
 # Configuration
 DRY_RUN = os.getenv('DRY_RUN', 'False').lower() == 'true'
+# With DRY_RUN, serve canned balances, prices and orders to the Telegram commands instead of calling Kraken
+DRY_RUN_OFFLINE = DRY_RUN and os.getenv('DRY_RUN_OFFLINE', 'False').lower() == 'true'
 
 # Kraken API credentials
 api_key = os.getenv('KRAKEN_API_KEY')
@@ -12,19 +13,9 @@ api_secret = os.getenv('KRAKEN_API_SECRET')
 if not api_key or not api_secret:
     raise ValueError("KRAKEN_API_KEY and KRAKEN_API_SECRET environment variables must be set")
 
-# Initialize Kraken exchange
-kraken = ccxt.kraken({
+# Initialize Kraken exchange; the async client does its HTTP I/O on the event loop,
+# so every call must be awaited and the client closed on shutdown
+kraken = ccxt_async.kraken({
     'apiKey': api_key,
     'secret': api_secret,
 })
-
-# Global event loop
-_loop = None
-
-def get_event_loop():
-    """Get or create the event loop"""
-    global _loop
-    if _loop is None:
-        _loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_loop)
-    return _loop 
\ No newline at end of file